@@ -0,0 +1,62 @@
+"""Compares CascadingConfigDictionary.to_dictionary (structural conversion) with the previous
+json round trip implementation, in run time and peak memory.
+
+Usage: python benchmarks/clean_data_types_benchmark.py [depth] [width]
+"""
+import sys
+import json
+import time
+import tracemalloc
+from bole.config.cascading import CascadingConfig
+
+
+def generate_config(depth: int, width: int):
+    if depth == 0:
+        return CascadingConfig({f"key_{i}": f"value {i}" for i in range(width)})
+    config = CascadingConfig({f"key_{i}": generate_config(depth - 1, width) for i in range(width)})
+    config["list"] = [CascadingConfig(name=f"item {i}", enabled=i % 2 == 0, count=i) for i in range(width)]
+    return config
+
+
+def fast_json_round_trip(val):
+    """A json round trip with orjson (if installed), falls back to the python json module"""
+    try:
+        import orjson
+
+        return orjson.loads(orjson.dumps(val, option=orjson.OPT_NON_STR_KEYS))
+    except ImportError:
+        return json.loads(json.dumps(val))
+
+
+def measure(fn, repeat: int = 5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None or elapsed < best else best
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main(depth: int = 5, width: int = 8):
+    config = generate_config(depth, width)
+    implementations = {
+        "json round trip": lambda: json.loads(json.dumps(config)),
+        "orjson round trip": lambda: fast_json_round_trip(config),
+        "to_dictionary": lambda: config.to_dictionary(),
+        "to_dictionary (shallow)": lambda: config.to_dictionary(deep=False),
+    }
+
+    print(f"Config: depth={depth}, width={width}")
+    for name, fn in implementations.items():
+        elapsed, peak = measure(fn)
+        print(f"{name:>25}: {elapsed * 1000:8.1f} ms, peak memory {peak / 1024 / 1024:8.2f} MB")
+
+
+if __name__ == "__main__":
+    main(*[int(v) for v in sys.argv[1:]])
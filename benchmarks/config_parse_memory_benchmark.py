@@ -0,0 +1,68 @@
+"""Compares the peak memory (tracemalloc) and time of parsing large config files, when
+reading the file to a string first vs. streaming (yaml) / memory mapping (json) the file.
+
+Note: tracemalloc only tracks python allocations, memory allocated internally by native
+parsers (libyaml, orjson) is not included.
+
+Usage: python benchmarks/config_parse_memory_benchmark.py [entries]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from bole.backends import get_json_backend, get_yaml_backend
+from bole.config.cascading import parse_config_file
+
+
+def generate_config(entries: int):
+    return {
+        "flags": {
+            f"feature_{i}": {"enabled": i % 2 == 0, "rollout": i % 100, "owner": f"team {i % 17}"}
+            for i in range(entries)
+        },
+        "routes": [{"path": f"/api/v1/resource_{i}", "upstream": f"service-{i % 31}:8080"} for i in range(entries)],
+    }
+
+
+def parse_from_string(fpath: str, format: str):
+    with open(fpath, "r") as config_file:
+        text = config_file.read()
+    if text.strip() == "":
+        return {}
+    return get_yaml_backend().load(text) if format == "yaml" else get_json_backend().loads(text)
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(entries: int = 100000):
+    config = generate_config(entries)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        files = {
+            "yaml": os.path.join(temp_dir, "config.yaml"),
+            "json": os.path.join(temp_dir, "config.json"),
+        }
+        with open(files["yaml"], "w") as raw:
+            raw.write(get_yaml_backend().dump(config))
+        with open(files["json"], "w") as raw:
+            json.dump(config, raw)
+
+        for format, fpath in files.items():
+            assert parse_config_file(fpath, format) == config, f"Invalid parse result for {format}"
+            print(f"{format} ({os.path.getsize(fpath) / 1024 / 1024:.1f} MB):")
+            for name, fn in [("string", parse_from_string), ("stream", parse_config_file)]:
+                elapsed, peak = measure(fn, fpath, format)
+                print(f"{name:>10}: {elapsed * 1000:8.1f} ms, peak {peak / 1024 / 1024:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main(*[int(v) for v in sys.argv[1:]])
@@ -0,0 +1,57 @@
+"""Measures the reload time of a watched config when a single imported file changes. Only the
+changed file is parsed again, but all the files are merged again; the merge time shows the cost
+of re-merging the unchanged layers.
+
+Usage: python benchmarks/config_watch_benchmark.py [files] [entries]
+"""
+import os
+import sys
+import time
+import tempfile
+from bole.backends import get_yaml_backend
+from bole.config.cascading import CascadingConfig
+from bole.config.watch import CascadingConfigWatcher
+
+
+def generate_file(index: int, entries: int, version: int = 0):
+    return {
+        "services": {
+            f"service_{index}_{i}": {"port": 8000 + i, "hosts": [f"host-{i % 7}"], "version": version}
+            for i in range(entries)
+        },
+        "routes": [f"/api/{index}/{i}" for i in range(entries)],
+    }
+
+
+def write_file(fpath: str, config: dict):
+    with open(fpath, "w") as raw:
+        raw.write(get_yaml_backend().dump(config))
+
+
+def main(files: int = 200, entries: int = 50):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        write_file(os.path.join(temp_dir, "config.yaml"), {"import": ["parts/*.yaml"]})
+        os.mkdir(os.path.join(temp_dir, "parts"))
+        for i in range(files):
+            write_file(os.path.join(temp_dir, "parts", f"part_{i}.yaml"), generate_file(i, entries))
+
+        start = time.perf_counter()
+        CascadingConfig.load(temp_dir)
+        load_time = time.perf_counter() - start
+
+        watcher = CascadingConfigWatcher(temp_dir, settle_interval=0, profile=True)
+        write_file(os.path.join(temp_dir, "parts", "part_0.yaml"), generate_file(0, entries, version=1))
+        start = time.perf_counter()
+        assert watcher.check(), "Change was not detected"
+        reload_time = time.perf_counter() - start
+
+        profile = watcher.config.load_profile
+        parsed = [f for f in profile.files.values() if not f.cached]
+        print(f"Files: {files}, entries per file: {entries}")
+        print(f"{'full load':>12}: {load_time * 1000:8.1f} ms")
+        print(f"{'reload':>12}: {reload_time * 1000:8.1f} ms ({len(parsed)} file(s) parsed)")
+        print(f"{'merge':>12}: {profile.times.get('merge', 0.0) * 1000:8.1f} ms (all files)")
+
+
+if __name__ == "__main__":
+    main(*[int(v) for v in sys.argv[1:]])
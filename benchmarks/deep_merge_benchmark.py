@@ -0,0 +1,65 @@
+"""Compares bole.utils.deep_merge with the previous (pairwise, copying) implementation,
+over synthetic layered configs.
+
+Usage: python benchmarks/deep_merge_benchmark.py [depth] [width] [layers]
+"""
+import sys
+import copy
+import time
+from typing import Type
+from bole.utils import deep_merge, get_same_type
+
+
+def legacy_deep_merge(target, *sources, append_lists: bool = True):
+    """The previous deep_merge implementation (dict and appended lists branches)"""
+    if isinstance(target, list):
+        for src in sources:
+            target += src
+        return target
+
+    for src in sources:
+        for key in src.keys():
+            if key not in target:
+                target[key] = src[key]
+                continue
+            merge_type: Type = get_same_type(src[key], target[key], list, dict)
+            if merge_type is not None:
+                target[key] = legacy_deep_merge(merge_type(), target[key], src[key], append_lists=append_lists)
+            else:
+                target[key] = src[key]
+    return target
+
+
+def generate_layer(depth: int, width: int, layer: int):
+    if depth == 0:
+        return {f"key_{i}": f"value {layer}.{i}" for i in range(width)}
+    config = {f"key_{i}": generate_layer(depth - 1, width, layer) for i in range(width)}
+    config["list"] = [layer, layer + 1]
+    return config
+
+
+def measure(fn, repeat: int = 5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None or elapsed < best else best
+    return best
+
+
+def main(depth: int = 4, width: int = 8, layers: int = 6):
+    sources = [generate_layer(depth, width, i) for i in range(layers)]
+    assert legacy_deep_merge({}, *copy.deepcopy(sources)) == deep_merge({}, *sources)
+
+    # The load merges all the layers as sources into an empty target.
+    legacy = measure(lambda: legacy_deep_merge({}, *sources))
+    current = measure(lambda: deep_merge({}, *sources))
+
+    print(f"Layers: depth={depth}, width={width}, layers={layers}")
+    print(f"{'legacy deep_merge':>20}: {legacy * 1000:8.1f} ms")
+    print(f"{'deep_merge':>20}: {current * 1000:8.1f} ms (x{legacy / current:.1f})")
+
+
+if __name__ == "__main__":
+    main(*[int(v) for v in sys.argv[1:]])
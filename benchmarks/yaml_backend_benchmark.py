@@ -0,0 +1,45 @@
+"""Compares the load/dump times of the available yaml backends on large generated config trees.
+
+Usage: python benchmarks/yaml_backend_benchmark.py [depth] [width]
+"""
+import sys
+import time
+from bole.backends import YAML_BACKENDS
+
+
+def generate_config(depth: int, width: int, prefix: str = "key"):
+    if depth == 0:
+        return {f"{prefix}_{i}": f"value {i}" for i in range(width)}
+    config = {f"{prefix}_{i}": generate_config(depth - 1, width, prefix) for i in range(width)}
+    config["list"] = [{"name": f"item {i}", "enabled": i % 2 == 0, "count": i} for i in range(width)]
+    return config
+
+
+def measure(fn, repeat: int = 3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None or elapsed < best else best
+    return best
+
+
+def main(depth: int = 3, width: int = 8):
+    config = generate_config(depth, width)
+    text = YAML_BACKENDS["python"].dump(config)
+    print(f"Config size: {len(text) / 1024:.1f} KB (depth={depth}, width={width})")
+
+    results = {}
+    for name, backend in YAML_BACKENDS.items():
+        assert backend.load(text) == config, f"Backend {name} loaded an invalid config"
+        results[name] = (measure(lambda: backend.load(text)), measure(lambda: backend.dump(config)))
+        print(f"{name:>10}: load {results[name][0] * 1000:8.1f} ms, dump {results[name][1] * 1000:8.1f} ms")
+
+    if "libyaml" in results:
+        print(f"libyaml speedup: load x{results['python'][0] / results['libyaml'][0]:.1f}", end="")
+        print(f", dump x{results['python'][1] / results['libyaml'][1]:.1f}")
+
+
+if __name__ == "__main__":
+    main(*[int(v) for v in sys.argv[1:]])
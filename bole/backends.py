@@ -0,0 +1,164 @@
+import json
+import mmap
+import yaml
+from typing import Any, Callable, Dict, IO, Union
+from bole.consts import JSON_BACKEND, YAML_BACKEND
+from bole.exceptions import BoleException
+
+
+class YamlBackend:
+    def __init__(self, name: str, loader: type, dumper: type) -> None:
+        """A yaml implementation used to load and dump yaml documents.
+
+        Args:
+            name (str): The backend name.
+            loader (type): The yaml (safe) loader class.
+            dumper (type): The yaml (safe) dumper class.
+        """
+        self.name = name
+        self.loader = loader
+        self.dumper = dumper
+
+    def load(self, stream: Union[str, bytes, IO]) -> Any:
+        """Load a yaml document (same as yaml.safe_load)"""
+        return yaml.load(stream, Loader=self.loader)
+
+    def dump(self, val: Any, **kwargs) -> str:
+        """Dump a value to a yaml string (same as yaml.safe_dump)"""
+        return yaml.dump(val, Dumper=self.dumper, **kwargs)
+
+
+YAML_BACKENDS: Dict[str, YamlBackend] = {
+    "python": YamlBackend("python", yaml.SafeLoader, yaml.SafeDumper),
+}
+"""The available yaml backends, by name."""
+
+if getattr(yaml, "__with_libyaml__", False):
+    YAML_BACKENDS["libyaml"] = YamlBackend("libyaml", yaml.CSafeLoader, yaml.CSafeDumper)
+
+__yaml_backend: YamlBackend = None
+
+
+def set_yaml_backend(name: str = "auto") -> YamlBackend:
+    """Set the active yaml backend.
+
+    Args:
+        name (str, optional): The backend name (auto, libyaml, python). Auto will
+            select libyaml if available. Defaults to "auto".
+
+    Returns:
+        YamlBackend: The active backend.
+    """
+    global __yaml_backend
+    name = (name or "auto").strip().lower()
+    if name == "auto":
+        name = "libyaml" if "libyaml" in YAML_BACKENDS else "python"
+
+    assert name in YAML_BACKENDS, BoleException(
+        f"Yaml backend {name} is not available, available backends: {', '.join(YAML_BACKENDS.keys())}"
+    )
+
+    __yaml_backend = YAML_BACKENDS[name]
+    return __yaml_backend
+
+
+def get_yaml_backend() -> YamlBackend:
+    """Returns the active yaml backend"""
+    return __yaml_backend or set_yaml_backend(YAML_BACKEND)
+
+
+class JsonBackend:
+    def __init__(
+        self,
+        name: str,
+        loads: Callable[[Union[str, bytes]], Any] = json.loads,
+    ) -> None:
+        """A json implementation used to parse json documents.
+
+        Text output (dumps) always uses the python json module, since the fast implementations
+        cannot reproduce its formatting (separators, ascii escaping), and the output must be
+        the same regardless of the backend.
+
+        Args:
+            name (str): The backend name.
+            loads (Callable, optional): Parse a json document. Defaults to json.loads.
+        """
+        self.name = name
+        self.__loads = loads
+        # orjson parses buffers (memoryview) directly, without a bytes copy.
+        self.__loads_buffers = getattr(loads, "__module__", None) == "orjson"
+
+    def loads(self, text: Union[str, bytes]) -> Any:
+        """Parse a json document. Falls back to the python json module for documents
+        the backend cannot parse (e.g. NaN, large ints) such that results and errors are the same."""
+        if self.__loads is json.loads:
+            return json.loads(text)
+        try:
+            return self.__loads(text)
+        except (ValueError, OverflowError):
+            return json.loads(text)
+
+    def load_buffer(self, buffer: Union[bytes, memoryview, mmap.mmap]) -> Any:
+        """Parse a json document from a buffer (e.g. a memory mapped file). Backends that
+        support buffers parse it in place, otherwise the buffer is copied once to bytes."""
+        if self.__loads_buffers:
+            with memoryview(buffer) as view:
+                try:
+                    return self.__loads(view)
+                except (ValueError, OverflowError):
+                    pass
+        return self.loads(bytes(buffer))
+
+    def dumps(self, val: Any, **kwargs) -> str:
+        """Dump a value to a json string (same as json.dumps)"""
+        return json.dumps(val, **kwargs)
+
+
+JSON_BACKENDS: Dict[str, JsonBackend] = {
+    "python": JsonBackend("python"),
+}
+"""The available json backends, by name."""
+
+try:
+    import ujson
+
+    JSON_BACKENDS["ujson"] = JsonBackend("ujson", ujson.loads)
+except ImportError:
+    pass
+
+try:
+    import orjson
+
+    JSON_BACKENDS["orjson"] = JsonBackend("orjson", orjson.loads)
+except ImportError:
+    pass
+
+__json_backend: JsonBackend = None
+
+
+def set_json_backend(name: str = "auto") -> JsonBackend:
+    """Set the active json backend.
+
+    Args:
+        name (str, optional): The backend name (auto, orjson, ujson, python). Auto will
+            select the first available in that order. Defaults to "auto".
+
+    Returns:
+        JsonBackend: The active backend.
+    """
+    global __json_backend
+    name = (name or "auto").strip().lower()
+    if name == "auto":
+        name = next(n for n in ["orjson", "ujson", "python"] if n in JSON_BACKENDS)
+
+    assert name in JSON_BACKENDS, BoleException(
+        f"Json backend {name} is not available, available backends: {', '.join(JSON_BACKENDS.keys())}"
+    )
+
+    __json_backend = JSON_BACKENDS[name]
+    return __json_backend
+
+
+def get_json_backend() -> JsonBackend:
+    """Returns the active json backend"""
+    return __json_backend or set_json_backend(JSON_BACKEND)
@@ -1,9 +1,11 @@
 from typing import List
 import click
 from bole.config.cascading import CascadingConfig
+from bole.config.memory import ConfigMemoryUsage, intern_config_value
 from bole.format import PrintFormat
 
 from bole.log import log
+from bole.backends import get_json_backend, get_yaml_backend
 from bole.utils import clean_data_types, resolve_log_level
 from bole.consts import is_show_full_errors, __version__
 from bole.cli_options import CliConfigOptions, CliFormatOptions
@@ -58,6 +60,12 @@ def version():
     print(__version__)
 
 
+@bole.command("backends", help="Show the active serialization backends")
+def backends():
+    print(f"yaml: {get_yaml_backend().name}")
+    print(f"json: {get_json_backend().name}")
+
+
 @bole.command("log")
 @click.argument("level")
 @click.argument("message", nargs=-1)
@@ -73,6 +81,18 @@ def cli_log(level: str, message: List[str]):
         )
 
 
+def __get_config_stats(config: CascadingConfig):
+    """Helper method to measure the config memory usage (as loaded, interned and frozen)"""
+    loaded = ConfigMemoryUsage.measure(config)
+    interned = ConfigMemoryUsage.measure(intern_config_value(clean_data_types(config)))
+    frozen = ConfigMemoryUsage.measure(config.freeze())
+    return {
+        "loaded": loaded.to_dict(),
+        "interned": {**interned.to_dict(), "saved_bytes": loaded.size - interned.size},
+        "frozen": {**frozen.to_dict(), "saved_bytes": loaded.size - frozen.size},
+    }
+
+
 @bole.group("config")
 def config():
     """Config command options"""
@@ -113,8 +133,14 @@ def config_get(
 @CliConfigOptions.decorator()
 @CliFormatOptions.decorator(default_format=PrintFormat.yaml)
 def config_view(**kwargs):
-    config = CliConfigOptions(kwargs).load()
-    to_display = config.to_dictionary()
+    """Print the bole computed configuration. If multiple (comma separated) environments
+    are provided, e.g. --env dev,prod, print the configuration of each environment.
+    """
+    options = CliConfigOptions(kwargs)
+    if len(options.environments) > 1:
+        to_display = {env: config.to_dictionary() for env, config in options.load_environments().items()}
+    else:
+        to_display = options.load().to_dictionary()
 
     if not isinstance(to_display, list) and not isinstance(to_display, dict):
         print(str(to_display))  # Not a list or dict, don't format output.
@@ -123,6 +149,45 @@ def config_view(**kwargs):
     pass
 
 
+@config.command("compile")
+@CliConfigOptions.decorator()
+@click.argument("output")
+def config_compile(output: str, **kwargs):
+    """Compile the bole computed configuration into a binary snapshot file (OUTPUT),
+    which can be loaded without parsing the config files (CascadingConfig.load_snapshot).
+    Use a comma separated --env list to compile multiple environments.
+    """
+    snapshot = CliConfigOptions(kwargs).compile_snapshot(output)
+    print(f"Compiled {len(snapshot.configs)} environment(s) from {len(snapshot.manifest['files'])} file(s) -> {output}")
+
+
+@config.command("stats")
+@CliConfigOptions.decorator()
+@CliFormatOptions.decorator(default_format=PrintFormat.yaml)
+def config_stats(**kwargs):
+    """Print the memory used by the bole computed configuration (objects and bytes), as loaded,
+    interned (shared keys, strings and sub trees) and frozen.
+    """
+    config = CliConfigOptions(kwargs).load()
+    print(CliFormatOptions(kwargs).print(__get_config_stats(config)))
+
+
+@config.command("profile")
+@CliConfigOptions.decorator()
+@CliFormatOptions.decorator(allow_quote=False)
+def config_profile(**kwargs):
+    """Load the bole computed configuration and print where the load spends its time: the read and
+    parse time of each config file, the merge time and the number of file system calls. The cli and
+    list formats print a table.
+    """
+    profile = CliConfigOptions(kwargs).load(profile=True).load_profile
+    options = CliFormatOptions(kwargs)
+    if options.format in (PrintFormat.cli, PrintFormat.list):
+        print(profile.to_table())
+    else:
+        print(options.print(profile.to_dict()))
+
+
 def run_cli_main():
     try:
         bole()
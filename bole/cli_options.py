@@ -1,8 +1,9 @@
 import os
 import click
-from typing import Union
+from typing import Dict, List, Union
 from bole.config.cascading import CascadingConfig
 from bole.consts import is_show_full_errors, mark_show_full_errors
+from bole.exceptions import BoleException
 from bole.format import PrintFormat, get_print_formatted
 
 
@@ -56,6 +57,13 @@ class CliConfigOptions(dict):
     def environment(self) -> str:
         return self.get("env", None)
 
+    @property
+    def environments(self) -> List[str]:
+        """The environment names, if a comma separated list of environments was provided"""
+        if self.environment is None:
+            return [None]
+        return [e.strip() for e in self.environment.split(",") if len(e.strip()) > 0]
+
     @property
     def inherit_depth(self) -> int:
         return self.get("inherit_depth", -1)
@@ -64,23 +72,59 @@ class CliConfigOptions(dict):
     def full_errors(self) -> str:
         return self.get("full_errors", None)
 
+    @property
+    def parallel(self) -> str:
+        return self.get("parallel", None)
+
     def load(
         self,
         ignore_environment: bool = False,
         inherit_depth: int = None,
+        profile: bool = False,
     ) -> CascadingConfig:
         mark_show_full_errors(self.full_errors)
         inherit_depth = inherit_depth if inherit_depth is not None else self.inherit_depth
         inherit_depth = inherit_depth if inherit_depth is not None else -1
 
+        environments = [None] if ignore_environment else self.environments
+        assert len(environments) <= 1, BoleException(
+            f"Multiple environments ({self.environment}) are only supported when viewing or compiling a config"
+        )
+
         config = CascadingConfig.load(
             self.cwd,
-            environment=None if ignore_environment else self.environment,
+            environment=environments[0] if len(environments) > 0 else None,
             max_inherit_depth=inherit_depth,
+            executor=self.parallel,
+            profile=profile,
         )
 
         return config
 
+    def load_environments(self, inherit_depth: int = None) -> Dict[str, CascadingConfig]:
+        mark_show_full_errors(self.full_errors)
+        inherit_depth = inherit_depth if inherit_depth is not None else self.inherit_depth
+        inherit_depth = inherit_depth if inherit_depth is not None else -1
+
+        return CascadingConfig.load_environments(
+            self.cwd,
+            environments=self.environments,
+            max_inherit_depth=inherit_depth,
+            executor=self.parallel,
+        )
+
+    def compile_snapshot(self, fpath: str, inherit_depth: int = None):
+        mark_show_full_errors(self.full_errors)
+        inherit_depth = inherit_depth if inherit_depth is not None else self.inherit_depth
+        inherit_depth = inherit_depth if inherit_depth is not None else -1
+
+        return CascadingConfig.compile_snapshot(
+            fpath,
+            self.cwd,
+            environments=self.environments,
+            max_inherit_depth=inherit_depth,
+        )
+
     @classmethod
     def decorator(cls, long_args_only=False):
         def apply(fn):
@@ -96,7 +140,7 @@ class CliConfigOptions(dict):
                     "-e",
                     "--env",
                     "--environment",
-                    help="Name of the extra environment config to load",
+                    help="Name of the extra environment config to load (view, compile: comma separated for multiple)",
                     default=None,
                 ),
                 click.option(
@@ -105,6 +149,12 @@ class CliConfigOptions(dict):
                     default=None,
                     type=int,
                 ),
+                click.option(
+                    "--parallel",
+                    help="Read and parse config files concurrently using a thread or process pool",
+                    type=click.Choice(["thread", "process"]),
+                    default=None,
+                ),
                 click.option(
                     "--full-errors",
                     help="Show full python errors",
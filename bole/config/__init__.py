@@ -1,3 +1,16 @@
 from bole.config.cascading import *  # noqa
 from bole.config.built_in import *  # noqa
 from bole.config.dict import *  # noqa
+from bole.config.index import *  # noqa
+from bole.config.cache import *  # noqa
+from bole.config.context import *  # noqa
+from bole.config.profile import *  # noqa
+from bole.config.layered import *  # noqa
+from bole.config.lazy import *  # noqa
+from bole.config.graph import *  # noqa
+from bole.config.file_system import *  # noqa
+from bole.config.snapshot import *  # noqa
+from bole.config.store import *  # noqa
+from bole.config.memory import *  # noqa
+from bole.config.frozen import *  # noqa
+from bole.config.watch import *  # noqa
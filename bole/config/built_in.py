@@ -1,9 +1,9 @@
 import glob
 import os
-from typing import Union
+from typing import Tuple, Union
 from bole.config.dict import CascadingConfigDictionary
 from bole.exceptions import BoleException
-from bole.utils import resolve_path
+from bole.utils import compile_collection_path, resolve_path
 
 
 class CascadingConfigImport(CascadingConfigDictionary):
@@ -24,13 +24,44 @@ class CascadingConfigImport(CascadingConfigDictionary):
         """If true, this import is required (Ignored on glob search)"""
         return self.get("required", False)
 
-    def find_files(self, search_from_directory: str):
+    @property
+    def lazy(self) -> bool:
+        """If true, the imported files are parsed on first access (load_layered only). Lazy files are
+        data only, their imports and settings are ignored. Unmounted lazy files are parsed on the first
+        read of any key, use with mount to skip parsing"""
+        return self.get("lazy", False)
+
+    @property
+    def mount(self) -> str:
+        """If defined, the imported config is placed under this path (e.g. a.b), and is merged only
+        with the existing values at that path"""
+        return self.get("mount", None)
+
+    @property
+    def mount_keys(self) -> Tuple[str, ...]:
+        """The keys of the mount path, empty if not mounted"""
+        if not self.mount:
+            return ()
+        keys = compile_collection_path(self.mount).parts
+        assert all(type(k) is str for k in keys), BoleException(
+            f"Invalid import mount {self.mount}, a mount path cannot reference list items"
+        )
+        return keys
+
+    @property
+    def is_glob(self) -> bool:
+        """True if the import path is a glob pattern"""
+        return "*" in (self.path or "") or "?" in (self.path or "")
+
+    def find_files(self, search_from_directory: str, file_system=None):
         """Find files that match this import. (Glob search)
 
         Args:
             search_from_directory (str): For imports with partial paths,
             start searching for the import from this directory. Required since
             most imports are relative.
+            file_system (optional): An object that implements isfile, exists and glob(pattern, recursive),
+                used for the search (e.g. the load context). Defaults to the os file system.
 
         Returns:
             List[str]: The list of absolute paths to load the config from.
@@ -42,11 +73,16 @@ class CascadingConfigImport(CascadingConfigDictionary):
         import_path = resolve_path(self.path, root_directory=search_from_directory)
 
         if "*" in import_path or "?" in import_path:
-            return glob.glob(import_path, recursive=self.recursive is True)
+            if file_system is None:
+                return glob.glob(import_path, recursive=self.recursive is True)
+            return file_system.glob(import_path, recursive=self.recursive is True)
+
+        exists = os.path.exists if file_system is None else file_system.exists
+        isfile = os.path.isfile if file_system is None else file_system.isfile
 
         if self.required:
-            assert os.path.exists(import_path), BoleException(f"Invalid import, source path {import_path} not found")
-        return [import_path] if os.path.isfile(import_path) else []
+            assert exists(import_path), BoleException(f"Invalid import, source path {import_path} not found")
+        return [import_path] if isfile(import_path) else []
 
     @classmethod
     def parse(
@@ -0,0 +1,155 @@
+import os
+import stat
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Tuple
+from bole.consts import CONFIG_CACHE_DIRECTORY, CONFIG_CACHE_ENABLED, CONFIG_CACHE_MAX_SIZE
+from bole.config.profile import count_calls
+
+
+class ConfigFileCache:
+    def __init__(
+        self,
+        max_size: int = CONFIG_CACHE_MAX_SIZE,
+        cache_directory: str = CONFIG_CACHE_DIRECTORY,
+        enabled: bool = CONFIG_CACHE_ENABLED,
+    ) -> None:
+        """A cache of parsed config files. Entries are keyed by the file absolute path
+        and its stat signature (st_mtime_ns, st_size, st_ino), such that any change to
+        the file invalidates the entry.
+
+        Values are stored pickled, and a new copy is returned on every get, so callers
+        may freely modify the returned value.
+
+        Note: loading a pickle can execute code. The disk entries are used only if the cache directory
+        is owned by the current user and is not writable by others (the directory is created with owner
+        only permissions), otherwise the disk store is ignored.
+
+        Args:
+            max_size (int, optional): The max number of in memory entries (LRU). Defaults to CONFIG_CACHE_MAX_SIZE.
+            cache_directory (str, optional): If provided, also store the entries on disk in this
+                directory (shared between processes). Defaults to CONFIG_CACHE_DIRECTORY.
+            enabled (bool, optional): If false, the cache is disabled. Defaults to CONFIG_CACHE_ENABLED.
+        """
+        self.max_size = max_size
+        self.cache_directory = cache_directory
+        self.enabled = enabled
+        self.__entries: OrderedDict = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get_key(self, fpath: str, *args) -> Tuple:
+        """Returns the cache key for a file path.
+
+        Args:
+            fpath (str): The file path.
+            args: Extra key values (e.g. parser options).
+
+        Returns:
+            Tuple: The cache key, or None if the file is not a regular file or reports a zero
+                size (e.g. pipes, procfs files), since these can change without changing the signature.
+        """
+        fpath = os.path.abspath(fpath)
+        count_calls("stat")
+        info = os.stat(fpath)
+        if not stat.S_ISREG(info.st_mode) or info.st_size == 0:
+            return None
+        return (fpath, info.st_mtime_ns, info.st_size, info.st_ino, *args)
+
+    def __get_disk_path(self, key: Tuple) -> str:
+        name = hashlib.sha1(repr(key[0:1] + key[4:]).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_directory, name + ".pickle")
+
+    def is_disk_trusted(self) -> bool:
+        """True if the cache directory exists, is owned by the current user and is not writable by
+        group or others (such that only the current user can write the pickled entries)"""
+        try:
+            info = os.lstat(self.cache_directory)
+        except OSError:
+            return False
+        if not stat.S_ISDIR(info.st_mode) or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            return False
+        return not hasattr(os, "getuid") or info.st_uid == os.getuid()
+
+    def __read_disk(self, key: Tuple) -> bytes:
+        disk_path = self.__get_disk_path(key)
+        if not self.is_disk_trusted() or not os.path.isfile(disk_path):
+            return None
+        try:
+            with open(disk_path, "rb") as raw:
+                disk_key, data = pickle.load(raw)
+        except Exception:
+            # Corrupted or old cache entry, ignored.
+            return None
+        return data if disk_key == key else None
+
+    def __write_disk(self, key: Tuple, data: bytes):
+        disk_path = self.__get_disk_path(key)
+        os.makedirs(self.cache_directory, mode=0o700, exist_ok=True)
+        if not self.is_disk_trusted():
+            return
+        temp_path = f"{disk_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as raw:
+            pickle.dump((key, data), raw, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, disk_path)
+
+    def get(self, key: Tuple) -> Any:
+        """Returns a copy of the cached value, or None if not found.
+
+        Args:
+            key (Tuple): The cache key (see get_key)
+        """
+        if not self.enabled:
+            return None
+
+        with self.__lock:
+            data = self.__entries.get(key, None)
+            if data is not None:
+                self.__entries.move_to_end(key)
+
+        if data is None and self.cache_directory is not None:
+            data = self.__read_disk(key)
+            if data is not None:
+                self.__store(key, data)
+
+        return None if data is None else pickle.loads(data)
+
+    def set(self, key: Tuple, value: Any):
+        """Set a value in the cache.
+
+        Args:
+            key (Tuple): The cache key (see get_key)
+            value (Any): The value to store (must be picklable)
+        """
+        if not self.enabled:
+            return
+
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self.__store(key, data)
+        if self.cache_directory is not None:
+            self.__write_disk(key, data)
+
+    def __store(self, key: Tuple, data: bytes):
+        with self.__lock:
+            self.__entries[key] = data
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > max(self.max_size, 0):
+                self.__entries.popitem(last=False)
+
+    def clear(self):
+        """Clear the in memory cache (disk entries are invalidated by the file signature)"""
+        with self.__lock:
+            self.__entries.clear()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, key: Tuple) -> bool:
+        """True if the key is in the in memory cache"""
+        with self.__lock:
+            return key in self.__entries
+
+
+CONFIG_FILE_CACHE = ConfigFileCache()
+"""The default parsed config files cache"""
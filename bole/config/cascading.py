@@ -1,25 +1,120 @@
-import json
+import asyncio
+import collections
+import functools
+import mmap
 import os
-import yaml
-from typing import List, Union
-from bole.consts import CONFIG_SEARCH_PATHS
-from bole.exceptions import BoleException
+import re
+import stat
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Tuple, Union
+from bole.backends import get_json_backend, get_yaml_backend
+from bole.consts import CONFIG_INTERN_ENABLED, CONFIG_SEARCH_PATHS
+from bole.exceptions import BoleCircularImportException, BoleException
 from bole.utils import deep_merge
 
 from bole.config.dict import CascadingConfigDictionary
+from bole.config.cache import CONFIG_FILE_CACHE, ConfigFileCache
 from bole.config.built_in import CascadingConfigImport, CascadingConfigSettings
+from bole.config.context import CascadingConfigLoadContext, create_load_executor
+from bole.config.graph import CascadingConfigLoadGraph
+from bole.config.file_system import CascadingConfigFileSystem
+from bole.config.layered import LayeredCascadingConfig
+from bole.config.lazy import LazyCascadingConfigFile
+from bole.config.snapshot import CascadingConfigSnapshot
+from bole.config.frozen import FrozenConfig, freeze_config
+from bole.config.memory import intern_config_value
+from bole.config.profile import (
+    CONFIG_LOAD_PROFILE,
+    CascadingConfigLoadProfile,
+    count_calls,
+    create_load_profile,
+    profile_reader,
+    record_parse,
+)
+
+NON_WHITESPACE_REGEX = re.compile(rb"\S")
+"""Matches the first non whitespace byte of a document (searched in place, e.g. in a memory map)"""
+
+
+def parse_config_file(fpath: str, format: str) -> Any:
+    """Parse a config file without reading it to a string first. Yaml documents are streamed
+    from the open file, json documents are parsed from a memory map of the file. Empty
+    documents (empty, whitespace or yaml comments only) are parsed as an empty dictionary.
+    Files that are not regular files or report a zero size (e.g. pipes, procfs files) are read
+    to memory first, since their size is not known in advance.
 
+    Args:
+        fpath (str): The path to the config file.
+        format (str): The file format (yaml, json).
 
-def config_file_parser(fpath: str, default_format: str = "yaml") -> dict:
+    Returns:
+        Any: The parsed document.
+    """
+    with open(fpath, "rb") as config_file:
+        count_calls("stat")
+        info = os.fstat(config_file.fileno())
+        data = None
+        if not stat.S_ISREG(info.st_mode) or info.st_size == 0:
+            # Cannot be memory mapped, and may have content (e.g. procfs files report a zero size).
+            data = profile_reader(config_file, fpath).read()
+            if NON_WHITESPACE_REGEX.search(data) is None:
+                return {}
+            if format == "json":
+                return get_json_backend().loads(data)
+
+        if format == "yaml":
+            as_dict = get_yaml_backend().load(profile_reader(config_file, fpath) if data is None else data)
+            # An empty yaml document (whitespace/comments)
+            return {} if as_dict is None else as_dict
+
+        if format == "json":
+            profile: CascadingConfigLoadProfile = CONFIG_LOAD_PROFILE.get()
+            start = time.perf_counter()
+            with mmap.mmap(config_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                if profile is not None:
+                    # The pages are read while parsing.
+                    profile.add_read(fpath, time.perf_counter() - start, len(buffer))
+                if NON_WHITESPACE_REGEX.search(buffer) is None:
+                    return {}
+                return get_json_backend().load_buffer(buffer)
+
+    raise ValueError("Could not find a supported format type for " + fpath)
+
+
+def config_file_parser(
+    fpath: str,
+    default_format: str = "yaml",
+    cache: ConfigFileCache = None,
+    intern: bool = None,
+) -> dict:
     """Default configuration file parser.
 
     Args:
         fpath (str): The path to the config file.
         default_format (str, optional): The default format if cannot be identified by ext. Defaults to "yaml".
+        cache (ConfigFileCache, optional): The parsed files cache. Unchanged files (same path, mtime, size
+            and inode) are not parsed again. Defaults to CONFIG_FILE_CACHE.
+        intern (bool, optional): If true, intern the keys and strings of the parsed file. Defaults
+            to CONFIG_INTERN_ENABLED.
 
     Returns:
         dict: The loaded config file.
     """
+    cache = CONFIG_FILE_CACHE if cache is None else cache
+    intern = intern if intern is not None else CONFIG_INTERN_ENABLED
+    profile: CascadingConfigLoadProfile = CONFIG_LOAD_PROFILE.get()
+    start = time.perf_counter()
+    # The reads of this parse are not part of the parse time.
+    read_start = profile.get_file(fpath).read_time if profile is not None else 0.0
+    cache_key = cache.get_key(fpath, default_format) if cache.enabled else None
+    if cache_key is not None:
+        as_dict = cache.get(cache_key)
+        if as_dict is not None:
+            if profile is not None:
+                profile.add_parse(fpath, time.perf_counter() - start, cached=True)
+            return intern_config_value(as_dict, share_subtrees=False) if intern else as_dict
+
     _, format = os.path.splitext(fpath)
     if format.startswith("."):
         format = format[1:]
@@ -28,24 +123,25 @@ def config_file_parser(fpath: str, default_format: str = "yaml") -> dict:
 
     assert format in ["yaml", "json"], ValueError("Could not find a supported format type for " + fpath)
 
-    with open(fpath, "r") as config_file:
-        config_file_text = config_file.read()
-
-    if config_file_text.strip() == "":
-        as_dict = {}
-    elif format == "yaml":
-        as_dict = yaml.safe_load(config_file_text)
-    elif format == "json":
-        as_dict = json.loads(config_file_text)
-    else:
-        raise ValueError("Could not find a supported format type for " + fpath)
+    as_dict = parse_config_file(fpath, format)
+    if profile is not None:
+        read_time = profile.get_file(fpath).read_time - read_start
+        profile.add_parse(fpath, time.perf_counter() - start, read_time=read_time)
 
     assert isinstance(as_dict, dict), BoleException("Configuration files must represent a dictionary @ " + fpath)
-    return as_dict
+
+    if cache_key is not None:
+        cache.set(cache_key, as_dict)
+
+    return intern_config_value(as_dict, share_subtrees=False) if intern else as_dict
 
 
 CASCADING_CONFIG_IMPORT_KEY = "import"
 
+CASCADING_CONFIG_RESERVED_KEYS = (CASCADING_CONFIG_IMPORT_KEY, "settings", "environments")
+"""The reserved config keys. These are hidden in lazy imported files (such that settings and imports
+can be resolved without parsing them), and are not mounted with the imported values"""
+
 
 def merge_cascading_dicts(
     target: Union[dict, "CascadingConfig"],
@@ -78,6 +174,30 @@ def merge_cascading_dicts(
     return target
 
 
+class _ImportFrame:
+    def __init__(
+        self,
+        imports: List[CascadingConfigImport],
+        directory: str,
+        source: str,
+        edge_kind: str,
+        owner: "CascadingConfig" = None,
+        mount: Tuple[str, ...] = (),
+    ) -> None:
+        """Internal. The pending imports of a config (or the top level imports) while loading.
+        Imports are (import, None) or (matched file path, glob import) for expanded globs. The
+        owner and its imports are mounted under the mount keys."""
+        self.imports: Deque[Tuple[Union[CascadingConfigImport, str], CascadingConfigImport]] = collections.deque(
+            (i, None) for i in imports
+        )
+        self.directory = directory
+        self.source = source
+        self.edge_kind = edge_kind
+        self.owner = owner
+        self.mount = mount
+        self.stopped = False
+
+
 class CascadingConfig(CascadingConfigDictionary):
     def __init__(self, *args, **kwargs):
         """Implements a directory cascading config which allows
@@ -96,6 +216,9 @@ class CascadingConfig(CascadingConfigDictionary):
         super(CascadingConfigDictionary, self).__init__(*args, **kwargs)
         self.__source_path: str = None
         self.__source_directory: str = None
+        self.__parsed_values: Dict[str, Tuple[Any, Tuple, Any]] = {}
+        self.__load_graph: CascadingConfigLoadGraph = None
+        self.__load_profile: CascadingConfigLoadProfile = None
 
     @property
     def source_directory(self) -> str:
@@ -107,17 +230,74 @@ class CascadingConfig(CascadingConfigDictionary):
         """The source path this config was loaded from"""
         return self.__source_path
 
+    @property
+    def load_graph(self) -> CascadingConfigLoadGraph:
+        """The sources (files, directories) of the load that created this config. None if not loaded."""
+        return self.__load_graph
+
+    @property
+    def load_profile(self) -> CascadingConfigLoadProfile:
+        """The profile of the load that created this config (see load profile). None if not profiled."""
+        return self.__load_profile
+
+    @staticmethod
+    def __get_value_snapshot(val: Any) -> Tuple:
+        """Internal. Returns a shallow (two levels) snapshot of a dict or list value, used to detect changes."""
+        items = val.items() if isinstance(val, dict) else enumerate(val)
+        return tuple(
+            (k, tuple(v.items()) if isinstance(v, dict) else tuple(v) if isinstance(v, list) else v) for k, v in items
+        )
+
+    def __get_parsed_value(self, key: str, parse: Callable[[Any], Any], default: Callable[[], Any]):
+        """Internal. Returns the parsed value of a reserved key. The parsed value is cached
+        until the raw value (or its items) change.
+
+        Args:
+            key (str): The reserved key.
+            parse ((raw)=>Any): Parse the raw value.
+            default (()=>Any): Create the default raw value if the key is missing.
+        """
+        raw = self.get(key, None)
+        if raw is None:
+            return parse(default())
+
+        snapshot = self.__get_value_snapshot(raw) if isinstance(raw, (dict, list)) else None
+        cached = self.__parsed_values.get(key, None)
+        if cached is not None and cached[0] is raw and cached[1] == snapshot:
+            return cached[2]
+
+        parsed = parse(raw)
+
+        # Parsing may change the raw value in place.
+        snapshot = self.__get_value_snapshot(raw) if isinstance(raw, (dict, list)) else None
+        self.__parsed_values[key] = (raw, snapshot, parsed)
+        return parsed
+
     @property
     def config_imports(self) -> List[CascadingConfigImport]:
-        return CascadingConfigImport.parse_list(self.get(CASCADING_CONFIG_IMPORT_KEY, []))
+        return self.__get_parsed_value(CASCADING_CONFIG_IMPORT_KEY, CascadingConfigImport.parse_list, list)
 
     @property
-    def environments(self):
-        return self.parse_dictionary(self.get("environments", {}))
+    def environments(self) -> Dict[str, CascadingConfigDictionary]:
+        return self.__get_parsed_value("environments", self.parse_dictionary, dict)
 
     @property
     def settings(self) -> CascadingConfigSettings:
-        return CascadingConfigSettings.parse(self.get("settings", {}))
+        return self.__get_parsed_value("settings", CascadingConfigSettings.parse, dict)
+
+    def freeze(self, report: bool = False) -> FrozenConfig:
+        """Convert the config into an immutable, compact config (FrozenConfig). Dictionaries are
+        converted to frozen mappings and lists to tuples, keys are interned and identical sub trees
+        are shared. The frozen config can be shared between threads without locks.
+
+        Args:
+            report (bool, optional): If true, measure the memory saved (frozen.memory_report).
+                Defaults to False.
+
+        Returns:
+            FrozenConfig: The frozen config.
+        """
+        return freeze_config(self, report=report)
 
     def initialize(self, environment: str = None):
         """Call to initialize the configuration. Overridable."""
@@ -175,76 +355,233 @@ class CascadingConfig(CascadingConfigDictionary):
     def __load_siblings(
         cls,
         imports: List[CascadingConfigImport],
+        context: CascadingConfigLoadContext,
         environment: str = None,
-        parse_config=config_file_parser,
-        already_imported: set = None,
         load_imports: bool = True,
         search_from_directory: str = None,
-    ) -> List["CascadingConfig"]:
-        """Internal. Loads the configuration siblings by searching in the sibling source path"""
-        # Recreate the list to allow multiple files.
-        imports = list(imports)
-        already_imported = already_imported or set()
+        edge_kind: str = "import",
+        imported_from: str = None,
+        defer_lazy: bool = False,
+    ) -> List[Union["CascadingConfig", LazyCascadingConfigFile]]:
+        """Internal. Loads the configuration siblings by searching in the sibling source path.
+
+        Imports are resolved as a depth first traversal (a config comes after its imports). Files that
+        were already loaded (by real path and mount) are skipped, glob matches of files that are currently being
+        imported are skipped, and explicit circular imports raise a BoleCircularImportException.
+        Imported files without imports that are identical (content and mount) to an imported file are skipped.
+        If defer_lazy, lazy imports are returned as (not parsed) lazy config files.
+        """
+
+        def get_skip_reason(fpath: str, pattern: str, mount: Tuple[str, ...]) -> str:
+            realpath = context.get_realpath(fpath)
+            if realpath in context.import_stack:
+                if pattern is None:
+                    chain = list(context.import_stack.values()) + [fpath]
+                    raise BoleCircularImportException("Circular config import: " + " -> ".join(chain))
+                # A glob that matches a file that is being imported (e.g. itself)
+                return "skipped_cyclic_glob_imports"
+            if (realpath, mount) in context.visited:
+                # Already loaded (e.g. diamond imports), the first load has precedence.
+                return "skipped_duplicate_imports"
+            return None
+
+        def is_skipped(fpath: str, pattern: str, mount: Tuple[str, ...]) -> bool:
+            reason = get_skip_reason(fpath, pattern, mount)
+            if reason is not None:
+                context.graph.count(reason)
+            return reason is not None
 
         # The resulting configs.
         configs: List[cls] = []
 
-        # Processing imports
-        while len(imports) > 0:
-            config_import = imports.pop(0)
-            config_files = config_import.find_files(search_from_directory=search_from_directory)
-
-            # If no imports
-            if len(config_files) == 0:
+        # The traversal stack, the top level imports have no owner config.
+        stack: List[_ImportFrame] = [_ImportFrame(imports, search_from_directory, imported_from, edge_kind)]
+
+        while len(stack) > 0:
+            frame = stack[-1]
+            if len(frame.imports) == 0 or frame.stopped:
+                stack.pop()
+                if frame.owner is not None:
+                    # All the owner imports were loaded.
+                    del context.import_stack[context.get_realpath(frame.source)]
+                    owner = cls.__mount(frame.owner, frame.mount)
+                    configs.append(owner)
+                    if not owner.settings.inherit_siblings:
+                        stack[-1].stopped = True
                 continue
-            if len(config_files) > 1:
-                # More then one file. That would mean that it was a glob.
-                # Adding to the imports
-                imports = [
-                    CascadingConfigImport.parse(
-                        c,
-                        defaults={
-                            "recursive": False,
-                            "required": False,
-                        },
-                    )
-                    for c in config_files
-                ] + imports
+
+            config_import, glob_import = frame.imports.popleft()
+            pattern = glob_import.path if glob_import is not None else None
+            mount = frame.mount + (glob_import or config_import).mount_keys
+            if glob_import is not None:
+                # A glob match (file path)
+                config_filepath = config_import
+                config_import = glob_import
+                if is_skipped(config_filepath, pattern, mount) or not context.isfile(config_filepath):
+                    continue
+            else:
+                config_files = config_import.find_files(search_from_directory=frame.directory, file_system=context)
+                if config_import.is_glob:
+                    # Adding the matched files to the imports (skipped files are filtered on expand)
+                    matched = []
+                    skipped: Dict[str, int] = collections.defaultdict(int)
+                    for f in config_files:
+                        reason = get_skip_reason(f, config_import.path, mount)
+                        if reason is None:
+                            matched.append(f)
+                        else:
+                            skipped[reason] += 1
+                    for reason, count in skipped.items():
+                        context.graph.count(reason, count)
+
+                    if not (defer_lazy and config_import.lazy):
+                        context.prefetch(*matched)
+                    frame.imports.extendleft((f, config_import) for f in reversed(matched))
+                    continue
+
+                # If no imports
+                if len(config_files) == 0:
+                    continue
+                config_filepath = config_files[0]
+                if is_skipped(config_filepath, None, mount):
+                    continue
+
+            context.visited.add((context.get_realpath(config_filepath), mount))
+            context.graph.add_file(
+                config_filepath,
+                kind="glob" if pattern is not None else frame.edge_kind,
+                source=frame.source,
+                pattern=pattern if pattern is not None else (config_import.path if frame.source else None),
+            )
+
+            if (
+                frame.owner is not None
+                and not config_import.lazy
+                and context.find_identical_document(config_filepath, mount) is not None
+            ):
+                # A copy (or hard link) of an imported document, the first has precedence. Lazy
+                # imports are not compared, since that would require reading them.
+                context.graph.count("skipped_identical_imports")
                 continue
 
-            config_filepath = config_files[0]
-            if config_filepath in already_imported:
-                # Skipped. Already imported (circular)
+            if config_import.lazy:
+                # Lazy files are data only (no imports or settings), and are parsed on first access if deferred.
+                if defer_lazy:
+                    context.graph.count("deferred_lazy_imports")
+                    lazy_config = LazyCascadingConfigFile(
+                        config_filepath,
+                        load=functools.partial(
+                            cls.__load_lazy_file, config_filepath, context.parse_config, environment, context.profile
+                        ),
+                        hidden_keys=CASCADING_CONFIG_RESERVED_KEYS,
+                    )
+                    configs.append(cls.__mount(lazy_config, mount))
+                else:
+                    lazy_config = cls.__load_lazy_file(config_filepath, context.parse, environment)
+                    configs.append(cls.__mount(lazy_config, mount))
                 continue
 
             # Loading the config
-            config: cls = cls.parse(parse_config(config_filepath))
-            config.__merge_environment(environment=environment)
+            config: cls = cls.parse(context.parse(config_filepath))
+            with context.measure("merge"):
+                config.__merge_environment(environment=environment)
             config.__source_directory = os.path.dirname(config_filepath)
             config.__source_path = config_filepath
             config.initialize()
 
             if load_imports:
-                if config.settings.allow_imports:
+                config_imports = config.config_imports if config.settings.allow_imports else []
+                if CASCADING_CONFIG_IMPORT_KEY in config:
+                    del config[CASCADING_CONFIG_IMPORT_KEY]
+
+                if len(config_imports) > 0:
                     # if the config has imports they should come before it.
-                    configs += cls.__load_siblings(
-                        imports=config.config_imports,
-                        environment=environment,
-                        parse_config=parse_config,
-                        already_imported=already_imported,
-                        search_from_directory=config.source_directory,
+                    context.import_stack[context.get_realpath(config_filepath)] = config_filepath
+                    stack.append(
+                        _ImportFrame(
+                            config_imports,
+                            config.source_directory,
+                            config_filepath,
+                            "import",
+                            owner=config,
+                            mount=mount,
+                        )
                     )
+                    continue
 
-                if CASCADING_CONFIG_IMPORT_KEY in config:
-                    del config[CASCADING_CONFIG_IMPORT_KEY]
+            if frame.owner is not None:
+                context.add_document(config_filepath, mount)
 
+            config = cls.__mount(config, mount)
             configs.append(config)
 
             if not config.settings.inherit_siblings:
-                break
+                frame.stopped = True
 
         return configs
 
+    @classmethod
+    def __mount(
+        cls,
+        config: Union["CascadingConfig", LazyCascadingConfigFile],
+        mount: Tuple[str, ...],
+    ) -> "CascadingConfig":
+        """Internal. Returns a config with the values of config placed under the mount keys (the
+        settings stay at the root, the environments were already applied and are removed). Since the
+        mounted values are a single nested value, the merge only walks the existing values at the mount path."""
+        if len(mount) == 0:
+            return config
+        assert mount[0] not in CASCADING_CONFIG_RESERVED_KEYS, BoleException(
+            f"Invalid import mount {'.'.join(mount)}, cannot mount under a reserved key"
+        )
+
+        mounted: cls = cls()
+        if isinstance(config, CascadingConfig):
+            config.pop("environments", None)
+            for key in CASCADING_CONFIG_RESERVED_KEYS:
+                if key in config:
+                    mounted[key] = config.pop(key)
+            mounted.__source_directory = config.__source_directory
+            mounted.__source_path = config.__source_path
+            # A plain dictionary, like the other config values.
+            config = dict(config)
+
+        value = config
+        for key in reversed(mount[1:]):
+            value = {key: value}
+        mounted[mount[0]] = value
+        return mounted
+
+    @classmethod
+    def __load_lazy_file(
+        cls,
+        fpath: str,
+        parse_config: Callable[[str], dict],
+        environment: str = None,
+        profile: CascadingConfigLoadProfile = None,
+    ):
+        """Internal. Loads a lazy imported config file (see LazyCascadingConfigFile). Lazy files are data
+        only, the environment is applied and the reserved keys (imports, settings) are removed. If parsed
+        after the load, the parse is recorded in the load profile."""
+        if profile is not None and CONFIG_LOAD_PROFILE.get() is not profile:
+            token = CONFIG_LOAD_PROFILE.set(profile)
+            try:
+                start = time.perf_counter()
+                as_dict = parse_config(fpath)
+                record_parse(profile, fpath, start)
+            finally:
+                CONFIG_LOAD_PROFILE.reset(token)
+        else:
+            as_dict = parse_config(fpath)
+        config: cls = cls.parse(as_dict)
+        config.__merge_environment(environment=environment)
+        for key in CASCADING_CONFIG_RESERVED_KEYS:
+            config.pop(key, None)
+        config.__source_directory = os.path.dirname(fpath)
+        config.__source_path = fpath
+        config.initialize()
+        return config
+
     @classmethod
     def load(
         cls,
@@ -254,6 +591,10 @@ class CascadingConfig(CascadingConfigDictionary):
         load_imports: bool = True,
         search_paths: List[str] = CONFIG_SEARCH_PATHS,
         parse_config=config_file_parser,
+        executor: Union[Executor, str] = None,
+        graph: CascadingConfigLoadGraph = None,
+        file_system: CascadingConfigFileSystem = None,
+        profile: Union[bool, CascadingConfigLoadProfile] = False,
     ):
         """Loads a configuration from a source path.
 
@@ -266,31 +607,365 @@ class CascadingConfig(CascadingConfigDictionary):
                 Defaults to CONFIG_SEARCH_PATHS.
             parse_config ((fpath)=>dict, optional): Parses the config file into a dictionary.
                 Defaults to config_file_parser.
+            executor (Union[Executor, str], optional): If provided, read and parse the files of each search
+                group or glob import concurrently in this executor (merge order is not changed). If a
+                str (thread, process) create an executor of that type for the load. Note: executor processes
+                do not share the in memory parsed files cache. With the default parser, cached files are parsed
+                in this process, and the files parsed in the executor are added to the cache. A "process"
+                executor is created per load, pass an executor to reuse its processes. Defaults to None.
+            graph (CascadingConfigLoadGraph, optional): The load graph of a previous load (config.load_graph).
+                If none of its files and directories changed, its file searches are reused. Defaults to None.
+            file_system (CascadingConfigFileSystem, optional): A file system metadata cache (directory listings)
+                to use for the file searches, e.g. shared between loads with a ttl. If None, a cache is created
+                for this load, such that each directory is listed at most once. Defaults to None.
+            profile (Union[bool, CascadingConfigLoadProfile], optional): If true (or a profile object, e.g. a
+                custom profile that reports to a metrics system), record the read, parse and merge times and
+                the file system calls of the load in config.load_profile. Defaults to False.
 
         Returns:
             CascadingConfig: The merged/collected config.
         """
+        with CascadingConfigLoadContext(
+            parse_config=parse_config,
+            executor=executor,
+            graph=graph,
+            file_system=file_system,
+            profile=create_load_profile(profile),
+            cache=CONFIG_FILE_CACHE if parse_config is config_file_parser else None,
+        ) as context:
+            return cls.__load(
+                src,
+                context=context,
+                environment=environment,
+                max_inherit_depth=max_inherit_depth,
+                load_imports=load_imports,
+                search_paths=search_paths,
+            )
+
+    @classmethod
+    def load_layered(
+        cls,
+        src: str,
+        environment: str = None,
+        max_inherit_depth: int = -1,
+        load_imports: bool = True,
+        search_paths: List[str] = CONFIG_SEARCH_PATHS,
+        parse_config=config_file_parser,
+        executor: Union[Executor, str] = None,
+        graph: CascadingConfigLoadGraph = None,
+        file_system: CascadingConfigFileSystem = None,
+        profile: Union[bool, CascadingConfigLoadProfile] = False,
+    ) -> LayeredCascadingConfig:
+        """Loads a configuration from a source path as a lazy, read only layered view (see load).
+        The config files are parsed, but not merged. Keys are merged when accessed, and the merged
+        config can be materialized by calling to_dictionary.
+
+        Args:
+            src (str): The path (file or directory) to load from.
+            environment (str, optional): The environment name to load for. Defaults to None.
+            max_inherit_depth (int, optional): The max number of inherited parents. Defaults to -1.
+            load_imports (bool, optional): Load imports when inheriting. Defaults to True.
+            search_paths (List[str], optional): The paths/sub-paths where to look for config giles.
+                Defaults to CONFIG_SEARCH_PATHS.
+            parse_config ((fpath)=>dict, optional): Parses the config file into a dictionary.
+                Defaults to config_file_parser.
+            executor (Union[Executor, str], optional): The executor used to read files concurrently, see
+                load. Defaults to None.
+            graph (CascadingConfigLoadGraph, optional): The load graph of a previous load, see load.
+                Defaults to None.
+            file_system (CascadingConfigFileSystem, optional): A file system metadata cache, see load.
+                Defaults to None.
+            profile (Union[bool, CascadingConfigLoadProfile], optional): Record the load timings, see load.
+                Defaults to False.
+
+        Returns:
+            LayeredCascadingConfig: The layered config.
+        """
+        with CascadingConfigLoadContext(
+            parse_config=parse_config,
+            executor=executor,
+            graph=graph,
+            file_system=file_system,
+            profile=create_load_profile(profile),
+            cache=CONFIG_FILE_CACHE if parse_config is config_file_parser else None,
+        ) as context:
+            return cls.__load(
+                src,
+                context=context,
+                environment=environment,
+                max_inherit_depth=max_inherit_depth,
+                load_imports=load_imports,
+                search_paths=search_paths,
+                layered=True,
+            )
+
+    @classmethod
+    def load_environments(
+        cls,
+        src: str,
+        environments: List[str],
+        max_inherit_depth: int = -1,
+        load_imports: bool = True,
+        search_paths: List[str] = CONFIG_SEARCH_PATHS,
+        parse_config=config_file_parser,
+        executor: Union[Executor, str] = None,
+        file_system: CascadingConfigFileSystem = None,
+    ) -> Dict[str, "CascadingConfig"]:
+        """Loads the configurations of multiple environments from a source path (see load). The config
+        files are searched and parsed once, and shared between the environments (environment imports
+        are loaded as well).
+
+        Args:
+            src (str): The path (file or directory) to load from.
+            environments (List[str]): The environment names to load for. None loads without an environment.
+            max_inherit_depth (int, optional): The max number of inherited parents. Defaults to -1.
+            load_imports (bool, optional): Load imports when inheriting. Defaults to True.
+            search_paths (List[str], optional): The paths/sub-paths where to look for config giles.
+                Defaults to CONFIG_SEARCH_PATHS.
+            parse_config ((fpath)=>dict, optional): Parses the config file into a dictionary.
+                Defaults to config_file_parser.
+            executor (Union[Executor, str], optional): The executor used to read files concurrently, see
+                load. Defaults to None.
+            file_system (CascadingConfigFileSystem, optional): A file system metadata cache, see load.
+                Defaults to None.
+
+        Returns:
+            Dict[str, CascadingConfig]: The merged/collected config, by environment name.
+        """
+        parsed: Dict[str, bytes] = {}
+        file_system = file_system or CascadingConfigFileSystem()
+        owns_executor = isinstance(executor, str)
+        if owns_executor:
+            executor = create_load_executor(executor)
+
+        try:
+            configs: Dict[str, CascadingConfig] = {}
+            for environment in environments:
+                if environment in configs:
+                    continue
+                with CascadingConfigLoadContext(
+                    parse_config=parse_config,
+                    executor=executor,
+                    file_system=file_system,
+                    parsed=parsed,
+                    cache=CONFIG_FILE_CACHE if parse_config is config_file_parser else None,
+                ) as context:
+                    configs[environment] = cls.__load(
+                        src,
+                        context=context,
+                        environment=environment,
+                        max_inherit_depth=max_inherit_depth,
+                        load_imports=load_imports,
+                        search_paths=search_paths,
+                    )
+            return configs
+        finally:
+            if owns_executor:
+                executor.shutdown(wait=True)
+
+    @classmethod
+    def compile_snapshot(
+        cls,
+        fpath: str,
+        src: str,
+        environments: List[str] = None,
+        max_inherit_depth: int = -1,
+        load_imports: bool = True,
+        search_paths: List[str] = CONFIG_SEARCH_PATHS,
+        parse_config=config_file_parser,
+    ) -> CascadingConfigSnapshot:
+        """Load the configurations of the environments (see load_environments), and write the
+        merged configs to a binary snapshot file, which can be loaded with load_snapshot.
+
+        Args:
+            fpath (str): The snapshot file path.
+            src (str): The path (file or directory) to load from.
+            environments (List[str], optional): The environment names to load for. None loads
+                without an environment. Defaults to [None].
+            max_inherit_depth (int, optional): The max number of inherited parents. Defaults to -1.
+            load_imports (bool, optional): Load imports when inheriting. Defaults to True.
+            search_paths (List[str], optional): The paths/sub-paths where to look for config giles.
+                Defaults to CONFIG_SEARCH_PATHS.
+            parse_config ((fpath)=>dict, optional): Parses the config file into a dictionary.
+                Defaults to config_file_parser.
+
+        Returns:
+            CascadingConfigSnapshot: The written snapshot.
+        """
+        configs = cls.load_environments(
+            src,
+            environments=environments or [None],
+            max_inherit_depth=max_inherit_depth,
+            load_imports=load_imports,
+            search_paths=search_paths,
+            parse_config=parse_config,
+        )
+        snapshot = CascadingConfigSnapshot(
+            os.path.abspath(src),
+            {env: config.to_dictionary() for env, config in configs.items()},
+            graphs={env: config.load_graph.to_dict() for env, config in configs.items()},
+            manifest=CascadingConfigSnapshot.create_manifest([c.load_graph for c in configs.values()]),
+        )
+        snapshot.write(fpath)
+        return snapshot
+
+    @classmethod
+    def load_snapshot(
+        cls,
+        fpath: str,
+        src: str = None,
+        environment: str = None,
+        fallback: bool = True,
+        validate: bool = True,
+        **load_kwargs,
+    ) -> "CascadingConfig":
+        """Loads a configuration from a snapshot file (see compile_snapshot), without parsing
+        the config files.
+
+        Args:
+            fpath (str): The snapshot file path.
+            src (str, optional): The path to load from, if the snapshot cannot be used. Defaults to
+                the snapshot source path.
+            environment (str, optional): The environment name to load for. Defaults to None.
+            fallback (bool, optional): If true, and the snapshot is missing, does not match its sources
+                or does not hold the environment, load the config from the source path. Otherwise raise
+                an error. Defaults to True.
+            validate (bool, optional): Check that the snapshot sources did not change (a stat call per file,
+                and a listing per searched directory). Defaults to True.
+            load_kwargs: Extra arguments for load, used for the fallback load.
+
+        Returns:
+            CascadingConfig: The merged/collected config.
+        """
+        snapshot: CascadingConfigSnapshot = None
+        error: str = None
+        try:
+            snapshot = CascadingConfigSnapshot.read(fpath)
+        except (OSError, AssertionError, ValueError, EOFError, TypeError) as ex:
+            error = f"Could not read config snapshot {fpath}: {ex}"
+
+        if snapshot is not None:
+            if environment not in snapshot.configs:
+                error = f"Config snapshot {fpath} does not hold the environment {environment}"
+            elif validate and not snapshot.is_valid():
+                error = f"Config snapshot {fpath} does not match its sources"
+
+        if error is not None:
+            src = src or (snapshot.src if snapshot is not None else None)
+            assert fallback and src is not None, BoleException(error)
+            return cls.load(src, environment=environment, **load_kwargs)
+
+        config = cls.parse(snapshot.configs[environment])
+        # Same as load, the source path of a file source is its directory.
+        config.__source_path = snapshot.src if os.path.isdir(snapshot.src) else os.path.dirname(snapshot.src)
+        config.__source_directory = config.__source_path
+        config.__load_graph = snapshot.get_graph(environment)
+        return config
+
+    @classmethod
+    async def aload(
+        cls,
+        src: str,
+        environment: str = None,
+        max_inherit_depth: int = -1,
+        load_imports: bool = True,
+        search_paths: List[str] = CONFIG_SEARCH_PATHS,
+        parse_config: Union[Callable[[str], dict], Callable[[str], Awaitable[dict]]] = config_file_parser,
+        executor: Union[Executor, str] = "thread",
+        graph: CascadingConfigLoadGraph = None,
+        file_system: CascadingConfigFileSystem = None,
+        profile: Union[bool, CascadingConfigLoadProfile] = False,
+    ):
+        """Loads a configuration from a source path without blocking the event loop (same as load).
+        File searches, reads and parsing run in a worker thread, where independent files (search
+        groups and glob imports) are read concurrently.
+
+        Args:
+            src (str): The path (file or directory) to load from.
+            environment (str, optional): The environment name to load for. Defaults to None.
+            max_inherit_depth (int, optional): The max number of inherited parents. Defaults to -1.
+            load_imports (bool, optional): Load imports when inheriting. Defaults to True.
+            search_paths (List[str], optional): The paths/sub-paths where to look for config giles.
+                Defaults to CONFIG_SEARCH_PATHS.
+            parse_config ((fpath)=>dict | async (fpath)=>dict, optional): Parses the config file into a
+                dictionary. If async, runs on the calling event loop. Defaults to config_file_parser.
+            executor (Union[Executor, str], optional): The executor used to read files concurrently, see
+                load. Defaults to "thread".
+            graph (CascadingConfigLoadGraph, optional): The load graph of a previous load, see load.
+                Defaults to None.
+            file_system (CascadingConfigFileSystem, optional): A file system metadata cache, see load.
+                Defaults to None.
+            profile (Union[bool, CascadingConfigLoadProfile], optional): Record the load timings, see load.
+                Defaults to False.
+
+        Returns:
+            CascadingConfig: The merged/collected config.
+        """
+        loop = asyncio.get_running_loop()
+
+        if asyncio.iscoroutinefunction(parse_config):
+            assert not isinstance(executor, ProcessPoolExecutor) and executor != "process", ValueError(
+                "An async parse_config cannot be used with a process executor"
+            )
+            async_parse_config = parse_config
+
+            def parse_config(fpath: str) -> dict:
+                return asyncio.run_coroutine_threadsafe(async_parse_config(fpath), loop).result()
+
+        return await loop.run_in_executor(
+            None,
+            functools.partial(
+                cls.load,
+                src,
+                environment=environment,
+                max_inherit_depth=max_inherit_depth,
+                load_imports=load_imports,
+                search_paths=search_paths,
+                parse_config=parse_config,
+                executor=executor,
+                graph=graph,
+                file_system=file_system,
+                profile=profile,
+            ),
+        )
+
+    @classmethod
+    def __load(
+        cls,
+        src: str,
+        context: CascadingConfigLoadContext,
+        environment: str = None,
+        max_inherit_depth: int = -1,
+        load_imports: bool = True,
+        search_paths: List[str] = CONFIG_SEARCH_PATHS,
+        layered: bool = False,
+    ) -> Union["CascadingConfig", LayeredCascadingConfig]:
+        """Internal. Loads a configuration from a source path, see load and load_layered."""
+        start = time.perf_counter()
 
         # mapping configuration filepaths
         src = os.path.abspath(src)
         sibling_search_groups: List[List[str]] = []
-        if os.path.isfile(src):
+        if context.isfile(src):
             sibling_search_groups.append([src])
             src = os.path.dirname(src)
 
         src_directory = src
 
+        # The groups of the source file and directory, the rest are inherited.
+        source_group_count = len(sibling_search_groups) + 1
+
         # Finding all search groups from which to load the config
         sibling_search_groups += cls.__get_config_sibling_search_groups(src, search_paths)
 
         # Reading configurations as a cascading config.
         configurations: List[CascadingConfig] = []
 
-        for grp in sibling_search_groups:
+        for grp_index, grp in enumerate(sibling_search_groups):
             grp = list(grp)
             imports: List[CascadingConfigImport] = []
             for filepath in grp:
-                if not os.path.isfile(filepath):
+                if not context.isfile(filepath):
                     continue
                 imports.append(
                     CascadingConfigImport.parse(
@@ -305,29 +980,44 @@ class CascadingConfig(CascadingConfigDictionary):
             if len(imports) == 0:
                 continue
 
+            context.prefetch(*[i.path for i in imports])
             siblings = cls.__load_siblings(
                 imports,
+                context=context,
                 environment=environment,
-                parse_config=parse_config,
                 load_imports=load_imports,
+                edge_kind="search" if grp_index < source_group_count else "inherit",
+                defer_lazy=layered,
             )
             siblings.reverse()
-            grp_config = cls.parse(
-                {}
-                if len(siblings) == 0
-                else merge_cascading_dicts(
-                    {},
-                    *siblings,
-                    merge_source=siblings[-1],
-                ),
-            )
+            with context.measure("merge"):
+                if layered:
+                    grp_config = cls.__create_layered(
+                        siblings, merge_source=siblings[-1] if len(siblings) > 0 else None
+                    )
+                else:
+                    grp_config = cls.parse(
+                        {}
+                        if len(siblings) == 0
+                        else merge_cascading_dicts(
+                            {},
+                            *siblings,
+                            merge_source=siblings[-1],
+                        ),
+                    )
             configurations.append(grp_config)
 
             if not grp_config.settings.inherit:
                 break
 
         if len(configurations) == 0:
-            config = cls.parse({})
+            config = LayeredCascadingConfig([]) if layered else cls.parse({})
+        elif layered:
+            merge_source = configurations[0]
+            if max_inherit_depth > -1:
+                configurations = configurations[0 : max_inherit_depth + 1]  # noqa E203
+            configurations.reverse()
+            config = cls.__create_layered(configurations, merge_source=merge_source)
         else:
             merge_source = configurations[0]
 
@@ -338,15 +1028,45 @@ class CascadingConfig(CascadingConfigDictionary):
             configurations.reverse()
 
             # Merging the configuration into a new config.
-            config = cls.parse(
-                merge_cascading_dicts(
-                    {},
-                    *configurations,
-                    merge_source=merge_source,
+            with context.measure("merge"):
+                config = cls.parse(
+                    merge_cascading_dicts(
+                        {},
+                        *configurations,
+                        merge_source=merge_source,
+                    )
                 )
-            )
 
-        config.__source_path = src
-        config.__source_directory = src_directory
+            if CONFIG_INTERN_ENABLED:
+                # Share the repeated keys, strings and sub trees of the merged layers.
+                intern_config_value(config)
+
+        if layered:
+            config.source_path = src
+            config.source_directory = src_directory
+            config.load_graph = context.graph
+            config.load_profile = context.profile
+        else:
+            config.__source_path = src
+            config.__source_directory = src_directory
+            config.__load_graph = context.graph
+            config.__load_profile = context.profile
+
+        if context.profile is not None:
+            context.profile.add_time("total", time.perf_counter() - start)
 
         return config
+
+    @classmethod
+    def __create_layered(
+        cls,
+        layers: List[Union["CascadingConfig", LayeredCascadingConfig]],
+        merge_source: Union["CascadingConfig", LayeredCascadingConfig] = None,
+    ):
+        """Internal. Create a layered config using the merge source settings (see merge_cascading_dicts)"""
+        settings = merge_source.settings if merge_source is not None else CascadingConfigSettings()
+        return LayeredCascadingConfig(
+            layers,
+            use_deep_merge=settings.use_deep_merge,
+            concatenate_lists=settings.concatenate_lists,
+        )
@@ -0,0 +1,268 @@
+import contextlib
+import contextvars
+import os
+import pickle
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Set, Tuple, Union
+from bole.config.cache import ConfigFileCache
+from bole.config.graph import CascadingConfigLoadGraph
+from bole.config.file_system import CascadingConfigFileSystem
+from bole.config.snapshot import CascadingConfigSnapshot
+from bole.config.profile import CONFIG_LOAD_PROFILE, CascadingConfigLoadProfile, record_parse
+
+LOAD_EXECUTOR_TYPES: Dict[str, Callable[[], Executor]] = {
+    "thread": ThreadPoolExecutor,
+    "process": ProcessPoolExecutor,
+}
+"""Executor types that can be created by name when loading a config"""
+
+
+def create_load_executor(executor_type: str) -> Executor:
+    """Create a load executor by name, one of LOAD_EXECUTOR_TYPES"""
+    assert executor_type in LOAD_EXECUTOR_TYPES, ValueError(
+        f"Unknown executor type {executor_type}, expected one of: {', '.join(LOAD_EXECUTOR_TYPES.keys())}"
+    )
+    return LOAD_EXECUTOR_TYPES[executor_type]()
+
+
+class CascadingConfigLoadContext:
+    def __init__(
+        self,
+        parse_config: Callable[[str], dict],
+        executor: Union[Executor, str] = None,
+        graph: CascadingConfigLoadGraph = None,
+        file_system: CascadingConfigFileSystem = None,
+        parsed: Dict[str, bytes] = None,
+        profile: CascadingConfigLoadProfile = None,
+        cache: ConfigFileCache = None,
+    ) -> None:
+        """Internal. Holds the state of a single config load.
+
+        Args:
+            parse_config ((fpath)=>dict): Parses the config file into a dictionary.
+            executor (Union[Executor, str], optional): If provided, files in the same search group or
+                glob expansion are parsed concurrently in this executor. If a str (thread, process),
+                an executor of that type is created for this load. Defaults to None.
+            graph (CascadingConfigLoadGraph, optional): The dependency graph of a previous load. If still
+                valid, its search results are used instead of searching the file system. Defaults to None.
+            file_system (CascadingConfigFileSystem, optional): The file system metadata cache used for
+                file searches. If None, a new cache is created for this load. Defaults to None.
+            parsed (Dict[str, bytes], optional): If provided, the parsed config files are stored (pickled)
+                in this dictionary, and files that were already parsed are not parsed again. Used to share
+                parsing between loads. Defaults to None.
+            profile (CascadingConfigLoadProfile, optional): If provided, record the load timings and file
+                system calls. Defaults to None.
+            cache (ConfigFileCache, optional): The parsed files cache used by parse_config (the default parser).
+                With a process executor, files in the cache are parsed in this process, and the files parsed
+                in the executor processes are stored in it. Defaults to None.
+        """
+        self.parse_config = parse_config
+        self.__owns_executor = isinstance(executor, str)
+        if self.__owns_executor:
+            executor = create_load_executor(executor)
+        self.executor: Executor = executor
+        self.parsed = parsed
+        self.cache = cache
+        self.__cache_keys: Dict[str, Tuple] = {}
+        self.file_system = file_system or CascadingConfigFileSystem()
+        self.graph = CascadingConfigLoadGraph(file_system=self.file_system)
+        self.profile = profile
+        self.__pending: Dict[str, Future] = {}
+        self.__profile_token: contextvars.Token = None
+
+        # Import resolution state, the loaded files (real path, mount) and the files that are being
+        # imported (real paths).
+        self.visited: Set[Tuple[str, Tuple[str, ...]]] = set()
+        self.import_stack: Dict[str, str] = {}
+        self.__realpaths: Dict[str, str] = {}
+
+        # The loaded documents (imports without imports) by file size, and their content hashes.
+        self.__documents: Dict[int, List[Tuple[str, Tuple]]] = {}
+        self.__content_hashes: Dict[str, str] = {}
+
+        self.__graph = graph
+        self.__reused_graph: CascadingConfigLoadGraph = None
+
+    def get_realpath(self, fpath: str) -> str:
+        """Returns the (cached) real path of a file, used to identify files that were already loaded"""
+        realpath = self.__realpaths.get(fpath, None)
+        if realpath is None:
+            self.count("realpath")
+            realpath = self.__realpaths[fpath] = os.path.realpath(fpath)
+        return realpath
+
+    def get_content_hash(self, fpath: str) -> str:
+        """Returns the (cached) content hash of a file"""
+        realpath = self.get_realpath(fpath)
+        content_hash = self.__content_hashes.get(realpath, None)
+        if content_hash is None:
+            content_hash = self.__content_hashes[realpath] = CascadingConfigSnapshot.get_file_hash(realpath)
+        return content_hash
+
+    def get_size(self, fpath: str) -> int:
+        """Returns the size of a file from the file system cache (the load graph signature stat), or None"""
+        stat = self.file_system.stat(fpath)
+        return None if stat is None else stat.st_size
+
+    def add_document(self, fpath: str, key: Tuple = ()):
+        """Record a loaded document (a config file without imports), see find_identical_document.
+
+        Args:
+            fpath (str): The file path.
+            key (Tuple, optional): Documents are identical only if their keys are equal (e.g. the import mount).
+                Defaults to ().
+        """
+        size = self.get_size(fpath)
+        if size is not None:
+            self.__documents.setdefault(size, []).append((fpath, key))
+
+    def find_identical_document(self, fpath: str, key: Tuple = ()) -> str:
+        """Returns the path of a loaded document with the same content and key, or None. Files are
+        hashed only if a loaded document has the same size.
+
+        Args:
+            fpath (str): The file path.
+            key (Tuple, optional): The document key, see add_document. Defaults to ().
+        """
+        candidates = self.__documents.get(self.get_size(fpath), None)
+        if candidates is None:
+            return None
+        for candidate, candidate_key in candidates:
+            if candidate_key == key and self.get_content_hash(candidate) == self.get_content_hash(fpath):
+                return candidate
+        return None
+
+    def count(self, name: str, value: int = 1):
+        """Increment a profile counter (if profiling)"""
+        if self.profile is not None:
+            self.profile.count(name, value)
+
+    @contextlib.contextmanager
+    def measure(self, name: str):
+        """Record the time of a load step in the profile (if profiling)"""
+        if self.profile is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.profile.add_time(name, time.perf_counter() - start)
+
+    @property
+    def reused_graph(self) -> bool:
+        """True if the search results of a previous load are reused"""
+        return self.__reused_graph is not None
+
+    def isfile(self, fpath: str) -> bool:
+        """Returns true if the path is a file (recorded in the load graph)"""
+        is_file = self.__reused_graph.get_isfile(fpath) if self.__reused_graph is not None else None
+        if is_file is None:
+            is_file = self.file_system.isfile(fpath)
+        self.graph.record_isfile(fpath, is_file)
+        return is_file
+
+    def exists(self, fpath: str) -> bool:
+        """Returns true if the path exists (recorded in the load graph)"""
+        exists = self.__reused_graph.get_exists(fpath) if self.__reused_graph is not None else None
+        if exists is None:
+            exists = self.file_system.exists(fpath)
+        self.graph.record_exists(fpath, exists)
+        return exists
+
+    def glob(self, pattern: str, recursive: bool = False) -> List[str]:
+        """Returns the paths that match a glob pattern (recorded in the load graph)"""
+        self.count("glob")
+        # Already searched in this load, or in the reused graph
+        matched = self.graph.get_glob(pattern, recursive)
+        if matched is not None:
+            return matched
+
+        matched = self.__reused_graph.get_glob(pattern, recursive) if self.__reused_graph is not None else None
+        if matched is None:
+            # The searched directories are the directories whose content can change the result.
+            listed = []
+            matched = self.file_system.glob(pattern, recursive=recursive, listed=listed)
+            for directory in listed:
+                self.graph.add_directory(directory)
+        self.graph.record_glob(pattern, recursive, matched, walk=False)
+        return matched
+
+    def prefetch(self, *fpaths: str):
+        """Start parsing the config files in the executor (if any). The results
+        are collected by calling parse, in the same order as without an executor.
+
+        Args:
+            fpaths (str): The config file paths.
+        """
+        if self.executor is None:
+            return
+        is_process = isinstance(self.executor, ProcessPoolExecutor)
+        for fpath in fpaths:
+            if is_process and self.cache is not None and self.cache.enabled and fpath not in self.__pending:
+                # The executor processes have their own cache, the cached files are not sent (the
+                # key of config_file_parser, with the default format).
+                cache_key = self.cache.get_key(fpath, "yaml")
+                if cache_key is None or cache_key in self.cache:
+                    continue
+                self.__cache_keys[fpath] = cache_key
+            if fpath not in self.__pending and (self.parsed is None or fpath not in self.parsed):
+                if self.profile is not None and not isinstance(self.executor, ProcessPoolExecutor):
+                    # The file reads are recorded in the (thread) executor as well.
+                    self.__pending[fpath] = self.executor.submit(
+                        contextvars.copy_context().run, self.parse_config, fpath
+                    )
+                else:
+                    self.__pending[fpath] = self.executor.submit(self.parse_config, fpath)
+
+    def parse(self, fpath: str) -> dict:
+        """Parse a config file, or collect the prefetched result.
+
+        Args:
+            fpath (str): The config file path.
+
+        Returns:
+            dict: The parsed config file.
+        """
+        if self.parsed is not None and fpath in self.parsed:
+            return pickle.loads(self.parsed[fpath])
+
+        start = time.perf_counter()
+        future = self.__pending.pop(fpath, None)
+        as_dict = future.result() if future is not None else self.parse_config(fpath)
+        record_parse(self.profile, fpath, start)
+        cache_key = self.__cache_keys.pop(fpath, None)
+        if future is not None and cache_key is not None:
+            # Parsed in an executor process
+            self.cache.set(cache_key, as_dict)
+        if self.parsed is not None:
+            # Stored as a copy, since the loaded configs are modified while merging.
+            self.parsed[fpath] = pickle.dumps(as_dict, protocol=pickle.HIGHEST_PROTOCOL)
+        return as_dict
+
+    def close(self):
+        """Cancel all unused prefetched files, and shutdown the executor if created by this context"""
+        for future in self.__pending.values():
+            future.cancel()
+        self.__pending.clear()
+        self.__cache_keys.clear()
+        # The loaded config keeps the graph, not the directory listings.
+        self.graph.file_system = None
+        if self.__owns_executor:
+            self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        if self.profile is not None:
+            self.__profile_token = CONFIG_LOAD_PROFILE.set(self.profile)
+        # Validated when the load starts, such that the stat calls are profiled.
+        if self.__graph is not None and self.__graph.is_valid():
+            self.__reused_graph = self.__graph
+            self.graph.copy_sources(self.__graph)
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        if self.__profile_token is not None:
+            CONFIG_LOAD_PROFILE.reset(self.__profile_token)
+            self.__profile_token = None
@@ -1,15 +1,107 @@
 from typing import Any, Callable, Dict, List, Union
-from bole.utils import clean_data_types, find_in_collection
+from bole.utils import CollectionPath, clean_data_types, compile_collection_path, find_in_collection
+from bole.config.index import CascadingConfigIndex
 
 
 class CascadingConfigDictionary(dict):
+    __use_index: bool = False
+    __index: CascadingConfigIndex = None
+
+    @property
+    def use_index(self) -> bool:
+        """If true, find and find_prefix use a flattened index of all the dictionary paths. The index
+        is built on the first query, and invalidated when the keys of this dictionary are changed.
+
+        NOTE: Changes to nested values (e.g. config["a"]["b"] = 1) are not tracked, and queries will
+        return the indexed values until invalidate_index is called."""
+        return self.__use_index
+
+    @use_index.setter
+    def use_index(self, val: bool):
+        self.__use_index = val
+        self.invalidate_index()
+
+    @property
+    def index(self) -> CascadingConfigIndex:
+        """The flattened dictionary paths index (built on first access)"""
+        if self.__index is None:
+            self.__index = CascadingConfigIndex(self)
+        return self.__index
+
+    def invalidate_index(self):
+        """Clear the flattened index. It will be rebuilt on the next query."""
+        self.__index = None
+
+    # Top level changes invalidate the index. The index is only cleared if it was built, such that
+    # writes to dictionaries that do not use an index are not slowed down.
+
+    def __setitem__(self, key, value):
+        if self.__index is not None:
+            self.__index = None
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        if self.__index is not None:
+            self.__index = None
+        super().__delitem__(key)
+
+    def __ior__(self, other):
+        if self.__index is not None:
+            self.__index = None
+        return super().__ior__(other)
+
+    def update(self, *args, **kwargs):
+        if self.__index is not None:
+            self.__index = None
+        super().update(*args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        if self.__index is not None:
+            self.__index = None
+        return super().setdefault(key, default)
+
+    def pop(self, *args):
+        if self.__index is not None:
+            self.__index = None
+        return super().pop(*args)
+
+    def popitem(self):
+        if self.__index is not None:
+            self.__index = None
+        return super().popitem()
+
+    def clear(self):
+        if self.__index is not None:
+            self.__index = None
+        super().clear()
+
+    def __getstate__(self):
+        # The index is not pickled (or copied), it is rebuilt on the next query.
+        state = dict(self.__dict__)
+        state.pop("_CascadingConfigDictionary__index", None)
+        return state
+
+    @staticmethod
+    def compile_path(path: str) -> CollectionPath:
+        """Compile a dictionary path (e.g. 'a.b[0].c') for repeated lookups with find. Compiled
+        paths are cached.
+
+        Args:
+            path (str): The dictionary path.
+
+        Returns:
+            CollectionPath: The compiled path.
+        """
+        return compile_collection_path(path)
+
     def find(
         self,
-        *paths: str,
+        *paths: Union[str, CollectionPath],
         action: Callable[[Any, Any], Any] = None,
     ) -> List[Any]:
         """Search the config for specific dictionary paths.
-        Paths is a list of string representations of dictionary paths.
+        Paths is a list of string representations of dictionary paths, or
+        compiled paths (see compile_path).
         Ex: paths = ['a.b[0].c']
 
         Args:
@@ -20,15 +112,39 @@ class CascadingConfigDictionary(dict):
         """
         found = []
         for p in paths:
-            val, was_found = find_in_collection(self, path=p, action=action)
+            if self.__use_index:
+                val, parent, was_found = self.index.get(p)
+                if was_found and action is not None:
+                    val = action(val, parent)
+                elif not was_found and not self.index.is_complete:
+                    val, was_found = find_in_collection(self, path=p, action=action)
+            else:
+                val, was_found = find_in_collection(self, path=p, action=action)
             if not was_found:
                 continue
             found.append(val)
         return found
 
-    def to_dictionary(self) -> dict:
-        """Convert this config to a dictionary"""
-        return clean_data_types(self)
+    def find_prefix(self, prefix: Union[str, CollectionPath] = "") -> Dict[str, Any]:
+        """Returns all the dictionary paths (and values) under a prefix path, using the flattened index.
+        Ex: prefix = 'a.b' -> {'a.b.c': 1, 'a.b.d[0]': 2, ...}
+
+        Args:
+            prefix (Union[str, CollectionPath], optional): The prefix path. Empty for all paths. Defaults to "".
+
+        Returns:
+            Dict[str, Any]: The path -> value for all paths under the prefix.
+        """
+        return self.index.find_prefix(prefix)
+
+    def to_dictionary(self, deep: bool = True, share_leaves: bool = True) -> dict:
+        """Convert this config to a dictionary
+
+        Args:
+            deep (bool, optional): If false, only convert the root dictionary. Defaults to True.
+            share_leaves (bool, optional): If true, leaf values are shared with this config. Defaults to True.
+        """
+        return clean_data_types(self, deep=deep, share_leaves=share_leaves)
 
     @classmethod
     def parse_dictionary(
@@ -0,0 +1,215 @@
+import os
+import glob
+import time
+import fnmatch
+from typing import Dict, Iterator, List, Tuple
+from bole.config.profile import count_calls
+
+
+class CascadingConfigFileSystem:
+    def __init__(self, ttl: float = None) -> None:
+        """A file system metadata cache, used for the file searches of a config load. Each
+        directory is listed once (os.scandir), and all the checks (isfile, exists, glob) of the
+        paths in that directory are answered from the listing.
+
+        Args:
+            ttl (float, optional): The max age (seconds) of a directory listing. If None, listings are kept
+                until invalidated, which is the case for the file system of a single load. Defaults to None.
+        """
+        self.ttl = ttl
+        # directory -> (listing time, entries by name, stat results by name)
+        self.__listings: Dict[str, Tuple[float, Dict[str, os.DirEntry], Dict[str, os.stat_result]]] = {}
+
+    def invalidate(self, directory: str = None):
+        """Invalidate the cached listing of a directory, or of all directories if None"""
+        if directory is None:
+            self.__listings.clear()
+        else:
+            self.__listings.pop(os.path.abspath(directory), None)
+
+    def __get_listing(self, directory: str) -> Tuple[float, Dict[str, os.DirEntry], Dict[str, os.stat_result]]:
+        if not os.path.isabs(directory):
+            directory = os.path.abspath(directory or os.curdir)
+        listing = self.__listings.get(directory, None)
+        if listing is not None and (self.ttl is None or time.monotonic() - listing[0] < self.ttl):
+            return listing
+
+        count_calls("listdir")
+        try:
+            with os.scandir(directory) as it:
+                entries = {entry.name: entry for entry in it}
+        except OSError:
+            entries = None
+        listing = self.__listings[directory] = (time.monotonic(), entries, {})
+        return listing
+
+    def list_directory(self, directory: str) -> Dict[str, os.DirEntry]:
+        """Returns the (cached) entries of a directory by name, in scandir order, or
+        None if the directory could not be listed."""
+        return self.__get_listing(directory)[1]
+
+    def __get_entry(self, path: str) -> os.DirEntry:
+        directory, name = os.path.split(path)
+        entries = self.list_directory(directory)
+        return None if entries is None else entries.get(name, None)
+
+    @staticmethod
+    def __is_special(path: str) -> bool:
+        # Paths that are not a name in a listing (root, trailing separator, relative parts)
+        return os.path.basename(path) in ("", os.curdir, os.pardir)
+
+    def stat(self, path: str) -> os.stat_result:
+        """Same as os.stat, or None if not found. The result is cached with the directory listing."""
+        try:
+            if self.__is_special(path):
+                count_calls("stat")
+                return os.stat(path)
+            directory, name = os.path.split(path)
+            _, entries, stats = self.__get_listing(directory)
+            if name not in stats:
+                entry = None if entries is None else entries.get(name, None)
+                if entry is not None:
+                    count_calls("stat")
+                stats[name] = None if entry is None else entry.stat()
+            return stats[name]
+        except OSError:
+            return None
+
+    def walk(self, directory: str) -> Iterator[str]:
+        """Same as the directories of os.walk (top down, symbolic links are not followed)"""
+        entries = self.list_directory(directory)
+        if entries is None:
+            return
+        yield directory
+        for entry in entries.values():
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                is_dir = False
+            if is_dir:
+                yield from self.walk(os.path.join(directory, entry.name))
+
+    def isfile(self, path: str) -> bool:
+        """Same as os.path.isfile"""
+        if self.__is_special(path):
+            count_calls("stat")
+            return os.path.isfile(path)
+        entry = self.__get_entry(path)
+        try:
+            return entry is not None and entry.is_file()
+        except OSError:
+            return False
+
+    def isdir(self, path: str) -> bool:
+        """Same as os.path.isdir"""
+        if self.__is_special(path):
+            return self.list_directory(path) is not None
+        entry = self.__get_entry(path)
+        try:
+            return entry is not None and entry.is_dir()
+        except OSError:
+            return False
+
+    def lexists(self, path: str) -> bool:
+        """Same as os.path.lexists"""
+        if self.__is_special(path):
+            count_calls("stat")
+            return os.path.lexists(path)
+        return self.__get_entry(path) is not None
+
+    def exists(self, path: str) -> bool:
+        """Same as os.path.exists"""
+        if self.__is_special(path):
+            count_calls("stat")
+            return os.path.exists(path)
+        entry = self.__get_entry(path)
+        if entry is None:
+            return False
+        # Broken links do not exist.
+        return not entry.is_symlink() or self.stat(path) is not None
+
+    def glob(self, pattern: str, recursive: bool = False, listed: List[str] = None) -> List[str]:
+        """Same as glob.glob (same matches and order), using the cached directory listings.
+
+        Args:
+            pattern (str): The glob pattern.
+            recursive (bool, optional): If true, ** matches any number of sub directories. Defaults to False.
+            listed (List[str], optional): If provided, the directories that were searched are
+                added to this list. Defaults to None.
+
+        Returns:
+            List[str]: The matched paths.
+        """
+        listed = listed if listed is not None else []
+        matched = list(self.__iglob(pattern, recursive, False, listed))
+        if recursive and pattern[:2] == "**" and len(matched) > 0 and not matched[0]:
+            # Same as glob, the empty match (current directory) is skipped.
+            matched.pop(0)
+        return matched
+
+    def __list_names(self, directory: str, dironly: bool, listed: List[str]) -> List[str]:
+        listed.append(os.path.abspath(directory or os.curdir))
+        entries = self.list_directory(directory)
+        if entries is None:
+            return []
+        if not dironly:
+            return list(entries.keys())
+        names = []
+        for name, entry in entries.items():
+            try:
+                if entry.is_dir():
+                    names.append(name)
+            except OSError:
+                pass
+        return names
+
+    def __iglob(self, pathname: str, recursive: bool, dironly: bool, listed: List[str]) -> Iterator[str]:
+        dirname, basename = os.path.split(pathname)
+        if not glob.has_magic(pathname):
+            if basename:
+                if self.lexists(pathname):
+                    yield pathname
+            elif self.isdir(dirname):
+                # Patterns ending with a separator match only directories
+                yield pathname
+            return
+
+        if dirname != pathname and glob.has_magic(dirname):
+            dirs = self.__iglob(dirname, recursive, True, listed)
+        else:
+            dirs = [dirname]
+
+        for dirname in dirs:
+            if not glob.has_magic(basename):
+                names = self.__glob0(dirname, basename)
+            elif recursive and basename == "**":
+                names = self.__glob2(dirname, dironly, listed)
+            else:
+                names = self.__glob1(dirname, basename, dironly, listed)
+            for name in names:
+                yield os.path.join(dirname, name)
+
+    def __glob0(self, dirname: str, basename: str) -> List[str]:
+        if basename:
+            return [basename] if self.lexists(os.path.join(dirname, basename)) else []
+        return [basename] if self.isdir(dirname) else []
+
+    def __glob1(self, dirname: str, pattern: str, dironly: bool, listed: List[str]) -> List[str]:
+        names = self.__list_names(dirname, dironly, listed)
+        if not pattern.startswith("."):
+            names = [n for n in names if not n.startswith(".")]
+        return fnmatch.filter(names, pattern)
+
+    def __glob2(self, dirname: str, dironly: bool, listed: List[str]) -> Iterator[str]:
+        yield ""
+        yield from self.__rlistdir(dirname, dironly, listed)
+
+    def __rlistdir(self, dirname: str, dironly: bool, listed: List[str]) -> Iterator[str]:
+        for name in self.__list_names(dirname, dironly, listed):
+            if name.startswith("."):
+                continue
+            yield name
+            path = os.path.join(dirname, name) if dirname else name
+            if self.isdir(path):
+                for sub_name in self.__rlistdir(path, dironly, listed):
+                    yield os.path.join(name, sub_name)
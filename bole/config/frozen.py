@@ -0,0 +1,181 @@
+import sys
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Union
+from bole.utils import CollectionPath, clean_data_types, find_in_collection
+from bole.config.memory import ConfigMemoryReport, ConfigMemoryUsage
+
+FROZEN_MAPPING_INDEX_SIZE = 8
+"""Frozen mappings with more keys than this have a key index (dict), smaller mappings
+are searched in their keys tuple"""
+
+
+class FrozenConfigMapping(Mapping):
+    __slots__ = ("__keys", "__values", "__index", "__hash")
+
+    def __init__(self, keys: Tuple, values: Tuple) -> None:
+        """An immutable, hashable config mapping, backed by a keys and a values tuple.
+        Use freeze_config_value to create.
+
+        Args:
+            keys (Tuple): The mapping keys.
+            values (Tuple): The (frozen) mapping values.
+        """
+        self.__keys = keys
+        self.__values = values
+        self.__index: Dict[Any, int] = (
+            {k: i for i, k in enumerate(keys)} if len(keys) > FROZEN_MAPPING_INDEX_SIZE else None
+        )
+        self.__hash: int = None
+
+    @property
+    def memory_storage(self) -> Tuple:
+        """The internal storage objects (for memory reports)"""
+        return (self.__keys, self.__values) if self.__index is None else (self.__keys, self.__values, self.__index)
+
+    def __get_position(self, key: Any) -> int:
+        if self.__index is not None:
+            return self.__index.get(key, -1)
+        for i, k in enumerate(self.__keys):
+            if k is key or k == key:
+                return i
+        return -1
+
+    def __getitem__(self, key: Any):
+        position = self.__get_position(key)
+        if position < 0:
+            raise KeyError(key)
+        return self.__values[position]
+
+    def __contains__(self, key: Any) -> bool:
+        return self.__get_position(key) >= 0
+
+    def __iter__(self) -> Iterator:
+        return iter(self.__keys)
+
+    def __len__(self) -> int:
+        return len(self.__keys)
+
+    def __hash__(self) -> int:
+        # Order independent, same as Mapping equality. Computing twice from two
+        # threads yields the same value.
+        if self.__hash is None:
+            self.__hash = hash(frozenset(zip(self.__keys, self.__values)))
+        return self.__hash
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        return Mapping.__eq__(self, other)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(zip(self.__keys, self.__values))})"
+
+    def find(
+        self,
+        *paths: Union[str, CollectionPath],
+        action: Callable[[Any, Any], Any] = None,
+    ) -> List[Any]:
+        """Search the config for specific dictionary paths
+        Ex: paths = ['a.b[0].c']
+
+        Args:
+            action ((value, parent)=>Any, optional): Action to take when the value is found. Defaults to None.
+
+        Returns:
+            List[Any]: The values that were found.
+        """
+        found = []
+        for p in paths:
+            val, was_found = find_in_collection(self, path=p, action=action)
+            if was_found:
+                found.append(val)
+        return found
+
+    def to_dictionary(self) -> dict:
+        """Convert to a (mutable) dictionary"""
+        return clean_data_types(self)
+
+
+class FrozenConfig(FrozenConfigMapping):
+    __slots__ = ("source_path", "source_directory", "memory_report")
+
+    def __init__(self, keys: Tuple, values: Tuple) -> None:
+        """An immutable, compact config (see CascadingConfig.freeze). Dictionaries are frozen
+        mappings, lists are tuples, keys are interned and identical sub trees are shared.
+        Frozen configs are never changed, and can be shared between threads without locks.
+        """
+        super().__init__(keys, values)
+        self.source_path: str = None
+        self.source_directory: str = None
+        self.memory_report: ConfigMemoryReport = None
+
+
+def freeze_config_value(
+    val: Any,
+    shared: Dict[Any, Any] = None,
+    mapping_type: type = FrozenConfigMapping,
+) -> Any:
+    """Convert a config value to its frozen form: dictionaries to frozen mappings, lists
+    to tuples. Keys and strings are interned, and identical values and sub trees are shared.
+
+    Args:
+        val (Any): The value to freeze.
+        shared (Dict[Any, Any], optional): The shared values, can be reused between calls to share
+            values between configs. Defaults to None.
+        mapping_type (type, optional): The type of the root mapping. Defaults to FrozenConfigMapping.
+
+    Returns:
+        Any: The frozen value.
+    """
+    shared = shared if shared is not None else {}
+
+    def share(key: Tuple, value: Any):
+        try:
+            return shared.setdefault(key, value)
+        except TypeError:
+            # Not hashable
+            return value
+
+    def get_share_key(value: Any):
+        # Frozen children are already shared, their identity is their value.
+        if isinstance(value, (FrozenConfigMapping, tuple)):
+            return id(value)
+        # Typed, such that 1, 1.0 and True (or 0.0 and -0.0) are not shared.
+        return (type(value), value.hex() if type(value) is float else value)
+
+    def freeze(value: Any, value_type: type = FrozenConfigMapping):
+        if isinstance(value, (dict, Mapping)):
+            keys = tuple(sys.intern(k) if type(k) is str else k for k in value.keys())
+            keys = share(("keys",) + tuple(get_share_key(k) for k in keys), keys)
+            values = tuple(freeze(v) for v in value.values())
+            if value_type is not FrozenConfigMapping:
+                return value_type(keys, values)
+            share_key = (FrozenConfigMapping, id(keys)) + tuple(get_share_key(v) for v in values)
+            return share(share_key, FrozenConfigMapping(keys, values))
+        if isinstance(value, (list, tuple)) or (isinstance(value, Sequence) and not isinstance(value, (str, bytes))):
+            values = tuple(freeze(v) for v in value)
+            return share((tuple,) + tuple(get_share_key(v) for v in values), values)
+        if type(value) is str:
+            return sys.intern(value)
+        return value
+
+    return freeze(val, mapping_type)
+
+
+def freeze_config(config: Mapping, report: bool = False) -> FrozenConfig:
+    """Freeze a config (see FrozenConfig).
+
+    Args:
+        config (Mapping): The config to freeze.
+        report (bool, optional): If true, measure the memory used before and after (memory_report).
+            Defaults to False.
+
+    Returns:
+        FrozenConfig: The frozen config.
+    """
+    frozen: FrozenConfig = freeze_config_value(config, mapping_type=FrozenConfig)
+    frozen.source_path = getattr(config, "source_path", None)
+    frozen.source_directory = getattr(config, "source_directory", None)
+    if report:
+        frozen.memory_report = ConfigMemoryReport(ConfigMemoryUsage.measure(config), ConfigMemoryUsage.measure(frozen))
+    return frozen
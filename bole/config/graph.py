@@ -0,0 +1,231 @@
+import glob
+import os
+from typing import Dict, List, Tuple, Union
+from bole.config.file_system import CascadingConfigFileSystem
+from bole.config.profile import count_calls
+
+LOAD_EDGE_KINDS = ["search", "inherit", "import", "glob"]
+"""The ways a config file can be included in a load:
+search - found in the source directory search paths,
+inherit - found in a parent directory search paths,
+import - an explicit import,
+glob - matched by a glob import.
+"""
+
+
+class CascadingConfigLoadEdge:
+    def __init__(self, path: str, kind: str, source: str = None, pattern: str = None) -> None:
+        """Describes why a config file was included in a load.
+
+        Args:
+            path (str): The config file path.
+            kind (str): The edge kind, one of LOAD_EDGE_KINDS.
+            source (str, optional): The config file that imported this file (import, glob). Defaults to None.
+            pattern (str, optional): The import path or glob pattern. Defaults to None.
+        """
+        self.path = path
+        self.kind = kind
+        self.source = source
+        self.pattern = pattern
+
+    def to_dict(self) -> dict:
+        return {"path": self.path, "kind": self.kind, "source": self.source, "pattern": self.pattern}
+
+    def __repr__(self) -> str:
+        return f"CascadingConfigLoadEdge({self.to_dict()})"
+
+
+class CascadingConfigLoadGraph:
+    def __init__(self, file_system: CascadingConfigFileSystem = None) -> None:
+        """The dependency graph of a config load: the config files that were loaded (in load order)
+        and why (edges), the path searches and glob results, and the directories whose content can
+        change the loaded config.
+
+        A graph can be validated with a batch of stat calls (is_valid), and passed to a later load
+        to reuse its search results instead of searching again.
+
+        Args:
+            file_system (CascadingConfigFileSystem, optional): The file system metadata cache used to
+                record the signatures and directories while loading (cleared when the load ends). If None,
+                the file system is called directly. Defaults to None.
+        """
+        self.file_system = file_system
+        self.__edges: List[CascadingConfigLoadEdge] = []
+        self.__files: Dict[str, None] = {}
+        self.__directories: Dict[str, None] = {}
+        self.__signatures: Dict[str, Tuple] = {}
+        self.__isfile: Dict[str, bool] = {}
+        self.__exists: Dict[str, bool] = {}
+        self.__globs: Dict[Tuple[str, bool], List[str]] = {}
+        self.__counters: Dict[str, int] = {}
+
+    @property
+    def files(self) -> List[str]:
+        """The loaded config files, in load order"""
+        return list(self.__files.keys())
+
+    @property
+    def directories(self) -> List[str]:
+        """The directories whose content can change the loaded config"""
+        return list(self.__directories.keys())
+
+    @property
+    def signatures(self) -> Dict[str, Tuple]:
+        """The stat signatures (see get_signature) of the files and directories, recorded while loading"""
+        return dict(self.__signatures)
+
+    @property
+    def edges(self) -> List[CascadingConfigLoadEdge]:
+        """The inclusion edges of the loaded config files, in load order"""
+        return list(self.__edges)
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        """Load diagnostics counters, e.g. the number of skipped duplicate imports"""
+        return dict(self.__counters)
+
+    def count(self, name: str, value: int = 1):
+        """Add to a load diagnostics counter"""
+        self.__counters[name] = self.__counters.get(name, 0) + value
+
+    def get_edges(self, fpath: str) -> List[CascadingConfigLoadEdge]:
+        """Returns the reasons (edges) a config file was included in the load"""
+        fpath = os.path.abspath(fpath)
+        return [e for e in self.__edges if e.path == fpath]
+
+    @staticmethod
+    def get_signature(path: str) -> Tuple:
+        """Returns the stat signature (mtime, size, inode) of a path, or None if not found"""
+        count_calls("stat")
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def __add_signature(self, path: str):
+        if path not in self.__signatures:
+            if self.file_system is None:
+                self.__signatures[path] = self.get_signature(path)
+            else:
+                stat = self.file_system.stat(path)
+                self.__signatures[path] = None if stat is None else (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def add_file(self, fpath: str, kind: str = "import", source: str = None, pattern: str = None):
+        """Record a loaded config file.
+
+        Args:
+            fpath (str): The config file path.
+            kind (str, optional): The edge kind, one of LOAD_EDGE_KINDS. Defaults to "import".
+            source (str, optional): The config file that imported this file. Defaults to None.
+            pattern (str, optional): The import path or glob pattern. Defaults to None.
+        """
+        self.__edges.append(CascadingConfigLoadEdge(fpath, kind, source=source, pattern=pattern))
+        self.__files[fpath] = None
+        self.__add_signature(fpath)
+
+    def add_directory(self, directory: str):
+        """Record a directory whose content can change the loaded config. If the directory
+        does not exist, its parent is recorded as well."""
+        while directory not in self.__directories:
+            self.__directories[directory] = None
+            self.__add_signature(directory)
+            parent = os.path.dirname(directory)
+            if self.__signatures[directory] is not None or parent == directory:
+                break
+            directory = parent
+
+    def add_search_path(self, fpath: str, walk: bool = True):
+        """Record a searched path (file or glob pattern). Records the directories whose
+        content can change the search result.
+
+        Args:
+            fpath (str): The absolute path or glob pattern.
+            walk (bool, optional): If false, do not record the sub directories of
+                glob patterns that match directories. Defaults to True.
+        """
+        if not glob.has_magic(fpath):
+            self.add_directory(os.path.dirname(fpath))
+            return
+
+        # The directory before the first glob part, and all of its sub directories
+        # if the pattern matches directories.
+        parts = fpath.split(os.sep)
+        magic_index = next(i for i, p in enumerate(parts) if glob.has_magic(p))
+        base_directory = os.sep.join(parts[:magic_index]) or os.sep
+        self.add_directory(base_directory)
+        if walk and magic_index < len(parts) - 1:
+            if self.file_system is None:
+                directories = (directory for directory, _, _ in os.walk(base_directory))
+            else:
+                directories = self.file_system.walk(base_directory)
+            for directory in directories:
+                self.add_directory(directory)
+
+    def record_isfile(self, fpath: str, is_file: bool):
+        """Record an isfile check"""
+        self.__isfile[fpath] = is_file
+        self.add_search_path(fpath)
+
+    def record_exists(self, fpath: str, exists: bool):
+        """Record an exists check"""
+        self.__exists[fpath] = exists
+        self.add_search_path(fpath)
+
+    def record_glob(self, pattern: str, recursive: bool, matched: List[str], walk: bool = True):
+        """Record a glob search result (see add_search_path)"""
+        self.__globs[(pattern, recursive)] = list(matched)
+        self.add_search_path(pattern, walk=walk)
+
+    def get_isfile(self, fpath: str) -> Union[bool, None]:
+        """Returns the recorded isfile check, or None if not recorded"""
+        return self.__isfile.get(fpath, None)
+
+    def get_exists(self, fpath: str) -> Union[bool, None]:
+        """Returns the recorded exists check, or None if not recorded"""
+        return self.__exists.get(fpath, None)
+
+    def get_glob(self, pattern: str, recursive: bool) -> Union[List[str], None]:
+        """Returns the recorded glob search result, or None if not recorded"""
+        matched = self.__globs.get((pattern, recursive), None)
+        return None if matched is None else list(matched)
+
+    def copy_sources(self, other: "CascadingConfigLoadGraph"):
+        """Copy the (validated) directories and signatures of another graph, instead of searching
+        and calling stat again."""
+        for path, signature in other.__signatures.items():
+            self.__signatures.setdefault(path, signature)
+        for directory in other.__directories.keys():
+            self.__directories.setdefault(directory, None)
+
+    def is_valid(self) -> bool:
+        """Returns true if none of the recorded files and directories changed since the load,
+        (a stat call per path) such that the recorded search results are still valid."""
+        return all(self.get_signature(path) == signature for path, signature in self.__signatures.items())
+
+    def to_dict(self) -> dict:
+        """Convert the graph to a dictionary (json/yaml serializable)"""
+        return {
+            "edges": [e.to_dict() for e in self.__edges],
+            "directories": self.directories,
+            "signatures": {p: list(s) if s is not None else None for p, s in self.__signatures.items()},
+            "isfile": dict(self.__isfile),
+            "exists": dict(self.__exists),
+            "globs": [{"pattern": p, "recursive": r, "matched": m} for (p, r), m in self.__globs.items()],
+            "counters": dict(self.__counters),
+        }
+
+    @classmethod
+    def from_dict(cls, val: dict) -> "CascadingConfigLoadGraph":
+        """Create a graph from a dictionary (see to_dict)"""
+        graph = cls()
+        for edge in val.get("edges", []):
+            graph.__edges.append(CascadingConfigLoadEdge(**edge))
+            graph.__files[edge["path"]] = None
+        graph.__directories = {d: None for d in val.get("directories", [])}
+        graph.__signatures = {p: tuple(s) if s is not None else None for p, s in val.get("signatures", {}).items()}
+        graph.__isfile = dict(val.get("isfile", {}))
+        graph.__exists = dict(val.get("exists", {}))
+        graph.__globs = {(g["pattern"], g["recursive"]): list(g["matched"]) for g in val.get("globs", [])}
+        graph.__counters = dict(val.get("counters", {}))
+        return graph
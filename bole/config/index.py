@@ -0,0 +1,96 @@
+import bisect
+from typing import Any, Dict, List, Tuple, Union
+from bole.utils import CollectionPath, compile_collection_path
+
+INDEX_UNSAFE_KEY_CHARS = ".[]"
+"""Dictionary keys that contain these chars cannot be indexed by their path"""
+
+
+class CascadingConfigIndex:
+    def __init__(self, root: Union[dict, list]) -> None:
+        """A flattened index of all the dictionary paths (e.g. 'a.b[3].c') within a collection,
+        used for constant time lookups and prefix queries. The index is a snapshot and must be
+        rebuilt if the collection changes.
+
+        Args:
+            root (Union[dict, list]): The collection to index.
+        """
+        self.__entries: Dict[str, Tuple[Any, Any]] = {}
+        self.__sorted_paths: List[str] = None
+
+        # If false, some keys could not be indexed (the index cannot be used to decide a path is missing)
+        self.is_complete = True
+        self.__build(root)
+
+    def __build(self, root: Union[dict, list]):
+        entries = self.__entries
+        pending = [("", root)]
+        while len(pending) > 0:
+            prefix, parent = pending.pop()
+            if isinstance(parent, dict):
+                for key, val in parent.items():
+                    if not isinstance(key, str) or len(key) == 0 or any(c in key for c in INDEX_UNSAFE_KEY_CHARS):
+                        self.is_complete = False
+                        continue
+                    path = f"{prefix}.{key}" if len(prefix) > 0 else key
+                    entries[path] = (val, parent)
+                    if isinstance(val, (dict, list)):
+                        pending.append((path, val))
+            elif isinstance(parent, list):
+                for i, val in enumerate(parent):
+                    path = f"{prefix}[{i}]"
+                    entries[path] = (val, parent)
+                    if isinstance(val, (dict, list)):
+                        pending.append((path, val))
+
+    @staticmethod
+    def get_index_key(path: Union[str, CollectionPath]) -> str:
+        """Returns the canonical path string used as the index key"""
+        if isinstance(path, str):
+            path = compile_collection_path(path)
+        return str(path)
+
+    def get(self, path: Union[str, CollectionPath]) -> Tuple[Any, Any, bool]:
+        """Find a path in the index.
+
+        Args:
+            path (Union[str, CollectionPath]): The path.
+
+        Returns:
+            (any: The value, any: The value parent, bool: True if found)
+        """
+        entry = self.__entries.get(self.get_index_key(path), None)
+        if entry is None:
+            return None, None, False
+        return entry[0], entry[1], True
+
+    def find_prefix(self, prefix: Union[str, CollectionPath] = "") -> Dict[str, Any]:
+        """Returns all the paths (and values) under a prefix path, e.g. 'a.b' -> {'a.b.c': 1, 'a.b[0]': 2}
+
+        Args:
+            prefix (Union[str, CollectionPath], optional): The prefix path. Empty for all paths. Defaults to "".
+
+        Returns:
+            Dict[str, Any]: The path -> value for all paths under the prefix (not including the prefix).
+        """
+        if self.__sorted_paths is None:
+            self.__sorted_paths = sorted(self.__entries.keys())
+
+        prefix = self.get_index_key(prefix)
+        if len(prefix) == 0:
+            return {p: self.__entries[p][0] for p in self.__sorted_paths}
+
+        found = {}
+        for sub_prefix in [prefix + ".", prefix + "["]:
+            for i in range(bisect.bisect_left(self.__sorted_paths, sub_prefix), len(self.__sorted_paths)):
+                path = self.__sorted_paths[i]
+                if not path.startswith(sub_prefix):
+                    break
+                found[path] = self.__entries[path][0]
+        return found
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, path: Union[str, CollectionPath]):
+        return self.get_index_key(path) in self.__entries
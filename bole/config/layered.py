@@ -0,0 +1,120 @@
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Union
+from bole.utils import CollectionPath, clean_data_types, deep_merge, find_in_collection
+from bole.config.built_in import CascadingConfigSettings
+from bole.config.graph import CascadingConfigLoadGraph
+from bole.config.frozen import FrozenConfig, freeze_config
+
+
+class LayeredCascadingConfig(Mapping):
+    def __init__(
+        self,
+        layers: List[Mapping],
+        use_deep_merge: bool = True,
+        concatenate_lists: bool = True,
+    ) -> None:
+        """A lazy, read only view of merged config layers. Keys are resolved on access by
+        walking the layers in precedence order, and merged only when touched. Nested dictionaries
+        that exist in more than one layer are returned as (lazy) layered views.
+
+        The resolved values are the same as the values of the (eagerly) merged config.
+
+        Args:
+            layers (List[Mapping]): The layers, in merge order (last takes precedence).
+            use_deep_merge (bool, optional): If false, a key is taken from the last layer that
+                defines it. Defaults to True.
+            concatenate_lists (bool, optional): If true, lists are concatenated (otherwise merged by index).
+                Defaults to True.
+        """
+        super().__init__()
+        self.layers = list(layers)
+        self.use_deep_merge = use_deep_merge
+        self.concatenate_lists = concatenate_lists
+        self.source_path: str = None
+        self.source_directory: str = None
+        self.load_graph: CascadingConfigLoadGraph = None
+        self.__resolved: Dict[Any, Any] = {}
+        self.__keys: List[Any] = None
+
+    @property
+    def settings(self) -> CascadingConfigSettings:
+        return CascadingConfigSettings.parse(clean_data_types(self.get("settings", {})))
+
+    def __resolve(self, values: List[Any]):
+        last = values[-1]
+        if not self.use_deep_merge:
+            return last
+
+        if isinstance(last, Mapping):
+            start = len(values) - 1
+            while start > 0 and isinstance(values[start - 1], Mapping):
+                start -= 1
+            if start == len(values) - 1:
+                return last
+            return LayeredCascadingConfig(values[start:], concatenate_lists=self.concatenate_lists)
+
+        if isinstance(last, list):
+            start = len(values) - 1
+            while start > 0 and isinstance(values[start - 1], list):
+                start -= 1
+            return deep_merge([], *values[start:], append_lists=self.concatenate_lists)
+
+        return last
+
+    def __getitem__(self, key):
+        if key in self.__resolved:
+            return self.__resolved[key]
+
+        values = [layer[key] for layer in self.layers if key in layer]
+        if len(values) == 0:
+            raise KeyError(key)
+
+        value = self.__resolved[key] = self.__resolve(values)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return key in self.__resolved or any(key in layer for layer in self.layers)
+
+    def __iter__(self) -> Iterator:
+        if self.__keys is None:
+            keys = {}
+            for layer in self.layers:
+                for key in layer:
+                    keys[key] = None
+            self.__keys = list(keys.keys())
+        return iter(self.__keys)
+
+    def __len__(self) -> int:
+        return len(list(iter(self)))
+
+    def __repr__(self) -> str:
+        return f"LayeredCascadingConfig({len(self.layers)} layers)"
+
+    def find(
+        self,
+        *paths: Union[str, CollectionPath],
+        action: Callable[[Any, Any], Any] = None,
+    ) -> List[Any]:
+        """Search the config for specific dictionary paths (only the touched keys are merged).
+        Ex: paths = ['a.b[0].c']
+
+        Args:
+            action ((value, parent)=>Any, optional): Action to take when the value is found. Defaults to None.
+
+        Returns:
+            List[Any]: The values that were found.
+        """
+        found = []
+        for p in paths:
+            val, was_found = find_in_collection(self, path=p, action=action)
+            if was_found:
+                found.append(val)
+        return found
+
+    def freeze(self, report: bool = False) -> FrozenConfig:
+        """Merge all the layers into an immutable, compact config (see CascadingConfig.freeze)"""
+        return freeze_config(self, report=report)
+
+    def to_dictionary(self) -> dict:
+        """Merge all the layers and convert to a dictionary"""
+        return clean_data_types(self)
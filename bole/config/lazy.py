@@ -0,0 +1,90 @@
+import threading
+from collections.abc import Mapping
+from typing import Any, Callable, Iterator, List, Tuple, Union
+from bole.utils import CollectionPath, clean_data_types, find_in_collection
+from bole.config.built_in import CascadingConfigSettings
+
+
+class LazyCascadingConfigFile(Mapping):
+    def __init__(
+        self,
+        fpath: str,
+        load: Callable[[], Mapping],
+        hidden_keys: Tuple[Any, ...] = (),
+    ) -> None:
+        """A read only view of an imported config file, that is parsed when a key is first
+        accessed (see the import lazy option). Used as a layer of a LayeredCascadingConfig.
+
+        Args:
+            fpath (str): The config file path.
+            load (()=>Mapping): Load (parse) the config file. Called once.
+            hidden_keys (Tuple[Any, ...], optional): Keys that are not part of the config, and are
+                resolved without loading the file (e.g. settings). Defaults to ().
+        """
+        super().__init__()
+        self.source_path = fpath
+        self.__load = load
+        self.__hidden_keys = frozenset(hidden_keys)
+        self.__config: Mapping = None
+        self.__lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        """True if the file was parsed"""
+        return self.__config is not None
+
+    @property
+    def settings(self) -> CascadingConfigSettings:
+        """Lazy files have no settings (the defaults)"""
+        return CascadingConfigSettings()
+
+    @property
+    def config(self) -> Mapping:
+        """The loaded config (loads the file on first access)"""
+        if self.__config is None:
+            with self.__lock:
+                if self.__config is None:
+                    self.__config = self.__load()
+        return self.__config
+
+    def __getitem__(self, key):
+        if key in self.__hidden_keys:
+            raise KeyError(key)
+        return self.config[key]
+
+    def __contains__(self, key) -> bool:
+        return key not in self.__hidden_keys and key in self.config
+
+    def __iter__(self) -> Iterator:
+        return (key for key in self.config if key not in self.__hidden_keys)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"LazyCascadingConfigFile({self.source_path}, loaded={self.is_loaded})"
+
+    def find(
+        self,
+        *paths: Union[str, CollectionPath],
+        action: Callable[[Any, Any], Any] = None,
+    ) -> List[Any]:
+        """Search the config for specific dictionary paths
+        Ex: paths = ['a.b[0].c']
+
+        Args:
+            action ((value, parent)=>Any, optional): Action to take when the value is found. Defaults to None.
+
+        Returns:
+            List[Any]: The values that were found.
+        """
+        found = []
+        for p in paths:
+            val, was_found = find_in_collection(self, path=p, action=action)
+            if was_found:
+                found.append(val)
+        return found
+
+    def to_dictionary(self) -> dict:
+        """Load and convert to a dictionary"""
+        return clean_data_types(self)
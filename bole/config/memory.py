@@ -0,0 +1,142 @@
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Tuple
+
+
+class ConfigMemoryUsage:
+    def __init__(self, objects: int = 0, size: int = 0) -> None:
+        """The memory used by a config value (the value, its collections, keys and leaf values).
+        Objects that are shared (e.g. interned strings, shared sub trees) are counted once.
+
+        Args:
+            objects (int, optional): The number of objects. Defaults to 0.
+            size (int, optional): The total size in bytes (sys.getsizeof). Defaults to 0.
+        """
+        self.objects = objects
+        self.size = size
+
+    @classmethod
+    def measure(cls, val: Any) -> "ConfigMemoryUsage":
+        """Measure the memory used by a config value"""
+        usage = cls()
+        seen = set()
+        pending = [val]
+        while len(pending) > 0:
+            cur = pending.pop()
+            if id(cur) in seen:
+                continue
+            seen.add(id(cur))
+            usage.objects += 1
+            usage.size += sys.getsizeof(cur)
+
+            if isinstance(cur, (dict, Mapping)):
+                for k, v in cur.items():
+                    pending.append(k)
+                    pending.append(v)
+            elif isinstance(cur, (list, tuple)):
+                pending.extend(cur)
+
+            # Internal storage of custom collections (e.g. __slots__ tuples)
+            for storage in getattr(cur, "memory_storage", ()):
+                if id(storage) not in seen:
+                    seen.add(id(storage))
+                    usage.objects += 1
+                    usage.size += sys.getsizeof(storage)
+        return usage
+
+    def to_dict(self) -> dict:
+        return {"objects": self.objects, "bytes": self.size}
+
+    def __repr__(self) -> str:
+        return f"ConfigMemoryUsage(objects={self.objects}, bytes={self.size})"
+
+
+class ConfigMemoryReport:
+    def __init__(self, before: ConfigMemoryUsage, after: ConfigMemoryUsage) -> None:
+        """Compares the memory used by a config before and after a conversion (e.g. freeze, intern)
+
+        Args:
+            before (ConfigMemoryUsage): The memory used before.
+            after (ConfigMemoryUsage): The memory used after.
+        """
+        self.before = before
+        self.after = after
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.before.size - self.after.size
+
+    @property
+    def saved_objects(self) -> int:
+        return self.before.objects - self.after.objects
+
+    def to_dict(self) -> dict:
+        return {
+            "before": self.before.to_dict(),
+            "after": self.after.to_dict(),
+            "saved": {"objects": self.saved_objects, "bytes": self.saved_bytes},
+        }
+
+    def __str__(self) -> str:
+        percent = 100.0 * self.saved_bytes / self.before.size if self.before.size > 0 else 0.0
+        return (
+            f"objects: {self.before.objects} -> {self.after.objects}, "
+            f"bytes: {self.before.size} -> {self.after.size} (saved {percent:.1f}%)"
+        )
+
+    def __repr__(self) -> str:
+        return f"ConfigMemoryReport({self})"
+
+
+def intern_config_value(val: Any, shared: Dict[Tuple, Any] = None, share_subtrees: bool = True) -> Any:
+    """Intern the keys and strings of a config value, and share identical sub trees (dicts, lists).
+    Dictionaries and lists are changed in place (the root value is kept).
+
+    Note: shared sub trees are the same object, changing a shared sub tree changes all its occurrences.
+
+    Args:
+        val (Any): The config value.
+        shared (Dict[Tuple, Any], optional): The shared sub trees, can be reused between calls to share
+            sub trees between configs. Defaults to None.
+        share_subtrees (bool, optional): If false, only intern keys and strings. Defaults to True.
+
+    Returns:
+        Any: The interned value.
+    """
+    shared = shared if shared is not None else {}
+
+    def get_share_key(value: Any):
+        # Children are already shared, their identity is their value.
+        if isinstance(value, (dict, list)):
+            return id(value)
+        # Typed, such that 1, 1.0 and True (or 0.0 and -0.0) are not shared.
+        return (type(value), value.hex() if type(value) is float else value)
+
+    def share(value: Any, items: Tuple):
+        if not share_subtrees:
+            return value
+        try:
+            return shared.setdefault((type(value),) + items, value)
+        except TypeError:
+            # Not hashable
+            return value
+
+    def intern_dict(value: dict):
+        interned = {sys.intern(k) if type(k) is str else k: intern(v) for k, v in value.items()}
+        value.clear()
+        value.update(interned)
+        return value
+
+    def intern(value: Any):
+        if type(value) is str:
+            return sys.intern(value)
+        if isinstance(value, dict):
+            intern_dict(value)
+            return share(value, tuple((get_share_key(k), get_share_key(v)) for k, v in value.items()))
+        if isinstance(value, list):
+            value[:] = [intern(v) for v in value]
+            return share(value, tuple(get_share_key(v) for v in value))
+        return value
+
+    # The root is kept (not replaced by a shared value).
+    return intern_dict(val) if isinstance(val, dict) else intern(val)
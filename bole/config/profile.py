@@ -0,0 +1,157 @@
+import contextvars
+import time
+from typing import Dict, List, Union
+
+CONFIG_LOAD_PROFILE: contextvars.ContextVar = contextvars.ContextVar("bole_config_load_profile", default=None)
+"""The profile of the active config load (if profiled), used to record the file reads and parsing"""
+
+
+class CascadingConfigFileProfile:
+    def __init__(self, fpath: str) -> None:
+        """The read and parse timings of a config file (see CascadingConfigLoadProfile).
+
+        Args:
+            fpath (str): The config file path.
+        """
+        self.fpath = fpath
+        self.read_time = 0.0
+        self.parse_time = 0.0
+        self.bytes = 0
+        self.cached = False
+
+    def to_dict(self) -> dict:
+        return {
+            "path": self.fpath,
+            "read_time": self.read_time,
+            "parse_time": self.parse_time,
+            "bytes": self.bytes,
+            "cached": self.cached,
+        }
+
+
+class CascadingConfigLoadProfile:
+    def __init__(self) -> None:
+        """Records where a config load spends its time (see the load profile argument): the read and
+        parse time of each config file, the merge time, and the number of file system calls (stat,
+        listdir and realpath calls, that were not answered from a cache) and glob imports.
+
+        Read times are the time spent in file reads. Memory mapped (json) files are read while
+        parsed, and their reads are included in the parse time. Files that were found in the parsed
+        files cache are marked as cached.
+
+        Can be overridden to forward the measurements (e.g. to a metrics system).
+        """
+        self.files: Dict[str, CascadingConfigFileProfile] = {}
+        self.times: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+
+    def get_file(self, fpath: str) -> CascadingConfigFileProfile:
+        """Returns the profile of a config file (created on first call)"""
+        file_profile = self.files.get(fpath, None)
+        if file_profile is None:
+            file_profile = self.files.setdefault(fpath, CascadingConfigFileProfile(fpath))
+        return file_profile
+
+    def add_read(self, fpath: str, duration: float, size: int):
+        """Record a file read (seconds, bytes)"""
+        file_profile = self.get_file(fpath)
+        file_profile.read_time += duration
+        file_profile.bytes += size
+
+    def add_parse(self, fpath: str, duration: float, cached: bool = False, read_time: float = 0.0):
+        """Record a file parse (seconds), read_time is the part of the duration spent in file reads
+        (recorded with add_read)"""
+        file_profile = self.get_file(fpath)
+        file_profile.parse_time += max(duration - read_time, 0.0)
+        file_profile.cached = cached
+
+    def add_time(self, name: str, duration: float):
+        """Record the time (seconds) of a load step (e.g. merge, total)"""
+        self.times[name] = self.times.get(name, 0.0) + duration
+
+    def count(self, name: str, value: int = 1):
+        """Increment a counter (e.g. stat, listdir, realpath, glob)"""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    @property
+    def read_time(self) -> float:
+        return sum(f.read_time for f in self.files.values())
+
+    @property
+    def parse_time(self) -> float:
+        return sum(f.parse_time for f in self.files.values())
+
+    @property
+    def bytes_read(self) -> int:
+        return sum(f.bytes for f in self.files.values())
+
+    def to_dict(self) -> dict:
+        return {
+            "total_time": self.times.get("total", 0.0),
+            "read_time": self.read_time,
+            "parse_time": self.parse_time,
+            "merge_time": self.times.get("merge", 0.0),
+            "bytes_read": self.bytes_read,
+            "counters": dict(self.counters),
+            "files": [f.to_dict() for f in self.files.values()],
+        }
+
+    def to_table(self) -> str:
+        """Returns the profile as a text table (files by read + parse time)"""
+        files = sorted(self.files.values(), key=lambda f: f.read_time + f.parse_time, reverse=True)
+        rows: List[List[str]] = [["read (ms)", "parse (ms)", "bytes", "cached", "path"]]
+        for f in files:
+            rows.append(
+                [f"{f.read_time * 1000:.2f}", f"{f.parse_time * 1000:.2f}", str(f.bytes), str(f.cached), f.fpath]
+            )
+        rows.append(
+            [f"{self.read_time * 1000:.2f}", f"{self.parse_time * 1000:.2f}", str(self.bytes_read), "", "(files)"]
+        )
+        widths = [max(len(row[i]) for row in rows) for i in range(4)]
+        lines = ["  ".join([row[i].rjust(widths[i]) for i in range(4)] + [row[4]]) for row in rows]
+
+        summary = [f"{name}: {duration * 1000:.2f} ms" for name, duration in sorted(self.times.items())]
+        summary += [f"{name}: {value}" for name, value in sorted(self.counters.items())]
+        return "\n".join(lines + [""] + summary)
+
+
+def create_load_profile(profile: Union[bool, CascadingConfigLoadProfile]) -> CascadingConfigLoadProfile:
+    """Returns the profile of a load profile argument (true, false or a profile object), or None"""
+    if isinstance(profile, CascadingConfigLoadProfile):
+        return profile
+    return CascadingConfigLoadProfile() if profile else None
+
+
+class _ProfiledReader:
+    def __init__(self, raw, fpath: str, profile: CascadingConfigLoadProfile) -> None:
+        """Internal. A file reader that records the read times and bytes (streamed parsing)"""
+        self.raw = raw
+        self.name = getattr(raw, "name", fpath)
+        self.__fpath = fpath
+        self.__profile = profile
+
+    def read(self, size: int = -1):
+        start = time.perf_counter()
+        data = self.raw.read(size)
+        self.__profile.add_read(self.__fpath, time.perf_counter() - start, len(data))
+        return data
+
+
+def record_parse(profile: CascadingConfigLoadProfile, fpath: str, start: float):
+    """Record the parse of a config file (since start, perf_counter) if it was not recorded by the
+    parser (e.g. a custom parser or a process executor)"""
+    if profile is not None and fpath not in profile.files:
+        profile.add_parse(fpath, time.perf_counter() - start)
+
+
+def count_calls(name: str, value: int = 1):
+    """Increment a counter of the active load profile (if profiling), called where the file system is called"""
+    profile: CascadingConfigLoadProfile = CONFIG_LOAD_PROFILE.get()
+    if profile is not None:
+        profile.count(name, value)
+
+
+def profile_reader(raw, fpath: str):
+    """Returns a reader that records the reads in the active load profile, or raw if not profiling"""
+    profile: CascadingConfigLoadProfile = CONFIG_LOAD_PROFILE.get()
+    return raw if profile is None else _ProfiledReader(raw, fpath, profile)
@@ -0,0 +1,187 @@
+import os
+import sys
+import struct
+import hashlib
+import marshal
+import datetime
+from typing import Any, Dict, List, Tuple
+from bole.exceptions import BoleException
+from bole.config.graph import CascadingConfigLoadGraph
+
+SNAPSHOT_MAGIC = b"BOLESNAP"
+"""The header of a config snapshot file"""
+
+SNAPSHOT_VERSION = 2
+"""The config snapshot format version, snapshots of other versions are not loaded"""
+
+SNAPSHOT_HASH_CHUNK_SIZE = 1024 * 1024
+"""The read size when hashing config files, such that large files are not read to memory at once"""
+
+_HEADER = struct.Struct("<8sIBBI")  # magic, version, python major, python minor, marshal version
+
+_TIME_TYPES = {"datetime": datetime.datetime, "date": datetime.date}
+
+
+def _encode_times(val: Any, path: Tuple, times: List[Tuple]) -> Any:
+    # Marshal cannot hold dates (e.g. yaml timestamps), these are stored as iso strings
+    # and their paths are recorded, such that loading does not walk the config.
+    if isinstance(val, dict):
+        return {k: _encode_times(v, path + (k,), times) for k, v in val.items()}
+    if isinstance(val, list):
+        return [_encode_times(v, path + (i,), times) for i, v in enumerate(val)]
+    if isinstance(val, (datetime.datetime, datetime.date)):
+        times.append((path, "datetime" if isinstance(val, datetime.datetime) else "date"))
+        return val.isoformat()
+    return val
+
+
+def _decode_times(val: Any, times: List[Tuple]) -> Any:
+    for path, time_type in times:
+        parent = val
+        for key in path[:-1]:
+            parent = parent[key]
+        parent[path[-1]] = _TIME_TYPES[time_type].fromisoformat(parent[path[-1]])
+    return val
+
+
+class CascadingConfigSnapshot:
+    def __init__(
+        self,
+        src: str,
+        configs: Dict[str, dict],
+        graphs: Dict[str, dict] = None,
+        manifest: Dict[str, Any] = None,
+    ) -> None:
+        """A compiled (pre merged) config snapshot. Holds the merged configs by environment, and
+        a manifest of their sources (file hashes and directory listings), used to check whether
+        the snapshot still matches the sources.
+
+        The snapshot is stored as a single marshal document (no yaml/json parsing). Since the marshal
+        format can change between python versions, snapshots are loaded only by the python (minor)
+        version and marshal version that wrote them.
+
+        Args:
+            src (str): The source path the configs were loaded from.
+            configs (Dict[str, dict]): The merged configs by environment name (None for no environment).
+            graphs (Dict[str, dict], optional): The load graphs (see CascadingConfigLoadGraph.to_dict)
+                by environment name. Defaults to None.
+            manifest (Dict[str, Any], optional): The sources manifest, see create_manifest. Defaults to None.
+        """
+        self.src = src
+        self.configs = configs
+        self.graphs = graphs or {}
+        self.manifest = manifest or {"files": {}, "directories": {}}
+
+    @staticmethod
+    def get_file_hash(fpath: str) -> str:
+        """Returns the sha256 hash of a file (read in chunks)"""
+        file_hash = hashlib.sha256()
+        with open(fpath, "rb") as raw:
+            for chunk in iter(lambda: raw.read(SNAPSHOT_HASH_CHUNK_SIZE), b""):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
+
+    @staticmethod
+    def get_directory_hash(directory: str) -> str:
+        """Returns the sha256 hash of a directory listing (entry names), or None if not found"""
+        try:
+            names = sorted(os.listdir(directory))
+        except OSError:
+            return None
+        return hashlib.sha256("\n".join(names).encode("utf-8")).hexdigest()
+
+    @classmethod
+    def create_manifest(cls, graphs: List[CascadingConfigLoadGraph]) -> Dict[str, Any]:
+        """Create a sources manifest from the load graphs of the snapshot configs.
+
+        Returns:
+            Dict[str, Any]: {files: {path: [size, mtime_ns, sha256]}, directories: {path: listing sha256}}
+        """
+        files = {}
+        directories = {}
+        for graph in graphs:
+            for fpath in graph.files:
+                if fpath not in files:
+                    stat = os.stat(fpath)
+                    files[fpath] = [stat.st_size, stat.st_mtime_ns, cls.get_file_hash(fpath)]
+            for directory in graph.directories:
+                if directory not in directories:
+                    directories[directory] = cls.get_directory_hash(directory)
+        return {"files": files, "directories": directories}
+
+    def is_valid(self) -> bool:
+        """Returns true if the snapshot sources did not change. Files with the same size and
+        modification time are not read, otherwise the file hash is compared."""
+        for fpath, (size, mtime_ns, sha256) in self.manifest["files"].items():
+            try:
+                stat = os.stat(fpath)
+            except OSError:
+                return False
+            if stat.st_size != size:
+                return False
+            if stat.st_mtime_ns != mtime_ns and self.get_file_hash(fpath) != sha256:
+                return False
+
+        for directory, sha256 in self.manifest["directories"].items():
+            if self.get_directory_hash(directory) != sha256:
+                return False
+
+        return True
+
+    def get_graph(self, environment: str = None) -> CascadingConfigLoadGraph:
+        """Returns the load graph of an environment config, or None if not found"""
+        graph = self.graphs.get(environment, None)
+        return None if graph is None else CascadingConfigLoadGraph.from_dict(graph)
+
+    def to_bytes(self) -> bytes:
+        times: Dict[str, List[Tuple]] = {}
+        configs = {}
+        for environment, config in self.configs.items():
+            times[environment] = []
+            configs[environment] = _encode_times(config, (), times[environment])
+
+        try:
+            body = marshal.dumps(
+                {
+                    "src": self.src,
+                    "configs": configs,
+                    "times": times,
+                    "graphs": self.graphs,
+                    "manifest": self.manifest,
+                }
+            )
+        except ValueError as ex:
+            raise BoleException(
+                f"Config snapshots can only hold basic value types (str, number, bool, null, date): {ex}"
+            )
+        header = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, *sys.version_info[:2], marshal.version)
+        return header + body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CascadingConfigSnapshot":
+        is_snapshot = len(data) >= _HEADER.size and data[0 : len(SNAPSHOT_MAGIC)] == SNAPSHOT_MAGIC  # noqa E203
+        assert is_snapshot, BoleException("Invalid config snapshot, unknown file header")
+        _, version, major, minor, marshal_version = _HEADER.unpack_from(data)
+        assert version == SNAPSHOT_VERSION, BoleException(
+            f"Invalid config snapshot version {version}, expected {SNAPSHOT_VERSION}"
+        )
+        assert (major, minor, marshal_version) == (*sys.version_info[:2], marshal.version), BoleException(
+            f"Invalid config snapshot, written by python {major}.{minor} (marshal version {marshal_version}), "
+            + f"expected python {sys.version_info[0]}.{sys.version_info[1]} (marshal version {marshal.version})"
+        )
+        body = marshal.loads(data[_HEADER.size :])  # noqa E203
+        configs = {env: _decode_times(config, body["times"].get(env, [])) for env, config in body["configs"].items()}
+        return cls(body["src"], configs, graphs=body["graphs"], manifest=body["manifest"])
+
+    def write(self, fpath: str):
+        """Write the snapshot to a file (atomic replace)"""
+        temp_path = f"{fpath}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as raw:
+            raw.write(self.to_bytes())
+        os.replace(temp_path, fpath)
+
+    @classmethod
+    def read(cls, fpath: str) -> "CascadingConfigSnapshot":
+        """Read a snapshot file (a single file read)"""
+        with open(fpath, "rb") as raw:
+            return cls.from_bytes(raw.read())
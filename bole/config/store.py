@@ -0,0 +1,302 @@
+import os
+import mmap
+import struct
+import pickle
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Union
+from bole.exceptions import BoleException
+from bole.utils import CollectionPath, clean_data_types, find_in_collection
+
+STORE_MAGIC = b"BOLESTOR"
+"""The header of a config store file"""
+
+STORE_VERSION = 1
+"""The config store format version, stores of other versions are not loaded"""
+
+# Value tags
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_BIG_INT = 4
+_FLOAT = 5
+_STR = 6
+_BYTES = 7
+_PICKLE = 8
+_LIST = 9
+_DICT = 10
+
+_HEADER = struct.Struct("<8sIQ")  # magic, version, root offset
+_TAG_COUNT = struct.Struct("<BI")  # tag, count/length
+_INT_VALUE = struct.Struct("<q")
+_FLOAT_VALUE = struct.Struct("<d")
+_OFFSET = struct.Struct("<Q")
+_ENTRY = struct.Struct("<QQ")  # key offset, value offset
+_INDEX = struct.Struct("<I")
+
+
+def _get_key_order(key: Any) -> Tuple:
+    """Internal. The sort order of dictionary keys in the store (binary search)"""
+    if key is None:
+        return (0, 0)
+    if isinstance(key, (bool, int, float)):
+        return (1, key)
+    if isinstance(key, str):
+        # utf-8 bytes order is the same as the str order.
+        return (2, key.encode("utf-8"))
+    return (3, pickle.dumps(key, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class _CascadingConfigStoreWriter:
+    def __init__(self) -> None:
+        """Internal. Encodes a config into the store format"""
+        self.data = bytearray(_HEADER.size)
+        self.__strings: Dict[str, int] = {}
+
+    def __append(self, *parts: bytes) -> int:
+        offset = len(self.data)
+        for part in parts:
+            self.data += part
+        return offset
+
+    def __write_str(self, val: str) -> int:
+        offset = self.__strings.get(val, None)
+        if offset is None:
+            encoded = val.encode("utf-8")
+            offset = self.__strings[val] = self.__append(_TAG_COUNT.pack(_STR, len(encoded)), encoded)
+        return offset
+
+    def __write_leaf(self, val: Any) -> int:
+        if val is None:
+            return self.__append(_TAG_COUNT.pack(_NONE, 0))
+        if val is True or val is False:
+            return self.__append(_TAG_COUNT.pack(_TRUE if val else _FALSE, 0))
+        if type(val) is int:
+            if -(2**63) <= val < 2**63:
+                return self.__append(_TAG_COUNT.pack(_INT, 0), _INT_VALUE.pack(val))
+            encoded = str(val).encode("utf-8")
+            return self.__append(_TAG_COUNT.pack(_BIG_INT, len(encoded)), encoded)
+        if type(val) is float:
+            return self.__append(_TAG_COUNT.pack(_FLOAT, 0), _FLOAT_VALUE.pack(val))
+        if type(val) is str:
+            return self.__write_str(val)
+        if type(val) is bytes:
+            return self.__append(_TAG_COUNT.pack(_BYTES, len(val)), val)
+        # Other leaf values (dates etc.)
+        encoded = pickle.dumps(val, protocol=pickle.HIGHEST_PROTOCOL)
+        return self.__append(_TAG_COUNT.pack(_PICKLE, len(encoded)), encoded)
+
+    def write(self, val: Any) -> int:
+        """Write a value (and its children), returns the value offset"""
+        if isinstance(val, (dict, Mapping)):
+            entries = [(self.write(k), self.write(v), k) for k, v in val.items()]
+            order = sorted(range(len(entries)), key=lambda i: _get_key_order(entries[i][2]))
+            return self.__append(
+                _TAG_COUNT.pack(_DICT, len(entries)),
+                b"".join(_ENTRY.pack(key_offset, value_offset) for key_offset, value_offset, _ in entries),
+                b"".join(_INDEX.pack(i) for i in order),
+            )
+        if isinstance(val, (list, tuple)) or (isinstance(val, Sequence) and not isinstance(val, (str, bytes))):
+            offsets = [self.write(v) for v in val]
+            return self.__append(
+                _TAG_COUNT.pack(_LIST, len(offsets)),
+                b"".join(_OFFSET.pack(offset) for offset in offsets),
+            )
+        return self.__write_leaf(val)
+
+    def to_bytes(self, root: Any) -> bytes:
+        root_offset = self.write(root)
+        _HEADER.pack_into(self.data, 0, STORE_MAGIC, STORE_VERSION, root_offset)
+        return bytes(self.data)
+
+
+class CascadingConfigStoreSequence(Sequence):
+    __slots__ = ("__buffer", "__offset", "__count")
+
+    def __init__(self, buffer: "CascadingConfigStore", offset: int) -> None:
+        """A read only list view of a config store, values are decoded when accessed"""
+        self.__buffer = buffer
+        self.__offset = offset + _TAG_COUNT.size
+        self.__count = _TAG_COUNT.unpack_from(buffer.data, offset)[1]
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.__count))]
+        if index < 0:
+            index += self.__count
+        if index < 0 or index >= self.__count:
+            raise IndexError("list index out of range")
+        return self.__buffer.decode(_OFFSET.unpack_from(self.__buffer.data, self.__offset + index * _OFFSET.size)[0])
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, tuple, CascadingConfigStoreSequence)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return False
+
+    def __repr__(self) -> str:
+        return f"CascadingConfigStoreSequence({self.__count} items)"
+
+    def to_list(self) -> list:
+        """Decode all the values to a list"""
+        return clean_data_types(self)
+
+
+class CascadingConfigStoreMapping(Mapping):
+    __slots__ = ("__buffer", "__offset", "__count")
+
+    def __init__(self, buffer: "CascadingConfigStore", offset: int) -> None:
+        """A read only dictionary view of a config store, keys are found by binary search and
+        values are decoded when accessed"""
+        self.__buffer = buffer
+        self.__offset = offset + _TAG_COUNT.size
+        self.__count = _TAG_COUNT.unpack_from(buffer.data, offset)[1]
+
+    def __get_entry(self, index: int) -> Tuple[int, int]:
+        return _ENTRY.unpack_from(self.__buffer.data, self.__offset + index * _ENTRY.size)
+
+    def __get_sorted_entry(self, position: int) -> Tuple[int, int]:
+        index_offset = self.__offset + self.__count * _ENTRY.size + position * _INDEX.size
+        return self.__get_entry(_INDEX.unpack_from(self.__buffer.data, index_offset)[0])
+
+    def __find(self, key: Any) -> int:
+        """Returns the value offset of a key, or -1 if not found"""
+        try:
+            order = _get_key_order(key)
+        except Exception:
+            return -1
+
+        low, high = 0, self.__count
+        while low < high:
+            middle = (low + high) // 2
+            key_offset, value_offset = self.__get_sorted_entry(middle)
+            middle_order = self.__buffer.get_key_order(key_offset)
+            if middle_order == order:
+                return value_offset
+            if middle_order < order:
+                low = middle + 1
+            else:
+                high = middle
+        return -1
+
+    def __getitem__(self, key: Any):
+        value_offset = self.__find(key)
+        if value_offset < 0:
+            raise KeyError(key)
+        return self.__buffer.decode(value_offset)
+
+    def __contains__(self, key: Any) -> bool:
+        return self.__find(key) >= 0
+
+    def __iter__(self) -> Iterator:
+        for i in range(self.__count):
+            yield self.__buffer.decode(self.__get_entry(i)[0])
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def __repr__(self) -> str:
+        return f"CascadingConfigStoreMapping({self.__count} keys)"
+
+    def find(
+        self,
+        *paths: Union[str, CollectionPath],
+        action: Callable[[Any, Any], Any] = None,
+    ) -> List[Any]:
+        """Search the config for specific dictionary paths
+        Ex: paths = ['a.b[0].c']
+
+        Args:
+            action ((value, parent)=>Any, optional): Action to take when the value is found. Defaults to None.
+
+        Returns:
+            List[Any]: The values that were found.
+        """
+        found = []
+        for p in paths:
+            val, was_found = find_in_collection(self, path=p, action=action)
+            if was_found:
+                found.append(val)
+        return found
+
+    def to_dictionary(self) -> dict:
+        """Decode all the values to a dictionary"""
+        return clean_data_types(self)
+
+
+class CascadingConfigStore(CascadingConfigStoreMapping):
+    def __init__(self, fpath: str) -> None:
+        """A read only config store, memory mapped from a store file (see CascadingConfigStore.write).
+        Values are decoded when accessed, and the file pages are shared by all the processes that
+        open the store (e.g. pre-fork workers), such that the config is held in memory once.
+
+        Args:
+            fpath (str): The store file path.
+        """
+        self.fpath = fpath
+        with open(fpath, "rb") as raw:
+            self.data = mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, root_offset = _HEADER.unpack_from(self.data, 0)
+        assert magic == STORE_MAGIC, BoleException(f"Invalid config store {fpath}, unknown file header")
+        assert version == STORE_VERSION, BoleException(
+            f"Invalid config store version {version} in {fpath}, expected {STORE_VERSION}"
+        )
+        assert self.data[root_offset] == _DICT, BoleException(f"Invalid config store {fpath}, root must be a dict")
+        super().__init__(self, root_offset)
+
+    @classmethod
+    def write(cls, fpath: str, config: Union[dict, Mapping]):
+        """Write a config (dictionary) to a store file (atomic replace)"""
+        assert isinstance(config, (dict, Mapping)), BoleException("A config store root must be a dictionary")
+        temp_path = f"{fpath}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as raw:
+            raw.write(_CascadingConfigStoreWriter().to_bytes(config))
+        os.replace(temp_path, fpath)
+
+    def decode(self, offset: int) -> Any:
+        """Decode the value at an offset. Dictionaries and lists are returned as (lazy) views"""
+        tag, count = _TAG_COUNT.unpack_from(self.data, offset)
+        start = offset + _TAG_COUNT.size
+        if tag == _STR:
+            return str(self.data[start : start + count], "utf-8")  # noqa E203
+        if tag == _DICT:
+            return CascadingConfigStoreMapping(self, offset)
+        if tag == _LIST:
+            return CascadingConfigStoreSequence(self, offset)
+        if tag == _INT:
+            return _INT_VALUE.unpack_from(self.data, start)[0]
+        if tag == _FLOAT:
+            return _FLOAT_VALUE.unpack_from(self.data, start)[0]
+        if tag == _NONE:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _BIG_INT:
+            return int(self.data[start : start + count])  # noqa E203
+        if tag == _BYTES:
+            return self.data[start : start + count]  # noqa E203
+        if tag == _PICKLE:
+            return pickle.loads(self.data[start : start + count])  # noqa E203
+        raise BoleException(f"Invalid config store {self.fpath}, unknown value tag {tag} @ {offset}")
+
+    def get_key_order(self, offset: int) -> Tuple:
+        """Internal. Returns the sort order of the key at an offset (see _get_key_order)"""
+        tag, count = _TAG_COUNT.unpack_from(self.data, offset)
+        if tag == _STR:
+            start = offset + _TAG_COUNT.size
+            return (2, self.data[start : start + count])  # noqa E203
+        return _get_key_order(self.decode(offset))
+
+    def close(self):
+        self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,324 @@
+import os
+import time
+import functools
+import select
+import threading
+import ctypes
+import ctypes.util
+from typing import Any, Callable, Dict, List, Tuple
+from bole.log import log
+from bole.config.cache import ConfigFileCache
+from bole.config.cascading import CascadingConfig, config_file_parser
+
+INOTIFY_WATCH_MASK = (
+    0x00000002  # IN_MODIFY
+    | 0x00000004  # IN_ATTRIB
+    | 0x00000008  # IN_CLOSE_WRITE
+    | 0x00000040  # IN_MOVED_FROM
+    | 0x00000080  # IN_MOVED_TO
+    | 0x00000100  # IN_CREATE
+    | 0x00000200  # IN_DELETE
+    | 0x00000400  # IN_DELETE_SELF
+    | 0x00000800  # IN_MOVE_SELF
+)
+"""The inotify events that trigger a config change check"""
+
+WATCH_MAX_SETTLE_CHECKS = 20
+"""The max number of settle intervals to wait for the changed sources to stop changing (see settle_interval)"""
+
+
+class CascadingConfigDiff:
+    def __init__(self, added: List[str] = None, removed: List[str] = None, changed: List[str] = None) -> None:
+        """The dictionary paths that changed between two configs.
+
+        Args:
+            added (List[str], optional): Paths that were added. Defaults to None.
+            removed (List[str], optional): Paths that were removed. Defaults to None.
+            changed (List[str], optional): Paths whose value changed. Defaults to None.
+        """
+        self.added = added or []
+        self.removed = removed or []
+        self.changed = changed or []
+
+    @property
+    def paths(self) -> List[str]:
+        """All the paths that changed (added, removed or changed)"""
+        return self.added + self.removed + self.changed
+
+    def __bool__(self):
+        return len(self.added) + len(self.removed) + len(self.changed) > 0
+
+    def __repr__(self) -> str:
+        return f"CascadingConfigDiff(added={self.added}, removed={self.removed}, changed={self.changed})"
+
+    @classmethod
+    def compare(cls, old: Any, new: Any, path: str = "") -> "CascadingConfigDiff":
+        """Compare two configs (or collections), and return the changed dictionary paths.
+        Lists are compared by index if they have the same length, otherwise the list path is changed.
+
+        Args:
+            old (Any): The old value.
+            new (Any): The new value.
+            path (str, optional): The root path. Defaults to "".
+        """
+        diff = cls()
+        pending = [(path, old, new)]
+        while len(pending) > 0:
+            cur_path, old_val, new_val = pending.pop()
+            if isinstance(old_val, dict) and isinstance(new_val, dict):
+                for key in old_val.keys():
+                    key_path = f"{cur_path}.{key}" if len(cur_path) > 0 else str(key)
+                    if key not in new_val:
+                        diff.removed.append(key_path)
+                    else:
+                        pending.append((key_path, old_val[key], new_val[key]))
+                for key in new_val.keys():
+                    if key not in old_val:
+                        diff.added.append(f"{cur_path}.{key}" if len(cur_path) > 0 else str(key))
+            elif isinstance(old_val, list) and isinstance(new_val, list) and len(old_val) == len(new_val):
+                for i in range(len(old_val)):
+                    pending.append((f"{cur_path}[{i}]", old_val[i], new_val[i]))
+            elif old_val != new_val or type(old_val) is not type(new_val):
+                diff.changed.append(cur_path)
+
+        for paths in [diff.added, diff.removed, diff.changed]:
+            paths.sort()
+        return diff
+
+
+class _INotify:
+    def __init__(self, paths: List[str]) -> None:
+        """Internal. A minimal inotify (linux) wrapper. Raises OSError if not available."""
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError("libc not found, inotify is not available")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "Failed to initialize inotify")
+
+        for path in paths:
+            # Missing paths are covered by polling.
+            libc.inotify_add_watch(self.fd, os.fsencode(path), INOTIFY_WATCH_MASK)
+
+    def wait(self, timeout: float) -> bool:
+        """Wait for events, returns true if any events were received"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if len(readable) == 0:
+            return False
+        try:
+            while len(os.read(self.fd, 65536)) > 0:
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+class CascadingConfigWatcher:
+    def __init__(
+        self,
+        src: str,
+        poll_interval: float = 1.0,
+        settle_interval: float = 0.05,
+        use_inotify: bool = True,
+        config_type: type = CascadingConfig,
+        **load_kwargs,
+    ) -> None:
+        """Watch the sources of a config (loaded files, searched directories, glob imports)
+        and reload the config when they change. Only changed files are parsed again (all the
+        files are merged again). Subscribers are notified with the new config and the changed
+        dictionary paths.
+
+        Args:
+            src (str): The path (file or directory) to load from.
+            poll_interval (float, optional): The interval in seconds between source checks. With
+                inotify, the max wait between checks. Defaults to 1.0.
+            settle_interval (float, optional): The time in seconds the changed sources must stay unchanged
+                before reloading, such that partially written files are not loaded. Defaults to 0.05.
+            use_inotify (bool, optional): Use inotify (linux) to detect changes. Falls back to
+                polling if not available. Defaults to True.
+            config_type (type, optional): The config class to load. Defaults to CascadingConfig.
+            load_kwargs: Extra arguments for config_type.load (environment, parse_config ...)
+        """
+        self.src = src
+        self.poll_interval = poll_interval
+        self.settle_interval = settle_interval
+        self.use_inotify = use_inotify
+        self.config_type = config_type
+        self.load_kwargs = load_kwargs
+
+        # Unchanged files are not parsed again. The default parser stores the files in this cache
+        # (instead of the global cache), custom parsers are wrapped.
+        self.__parsed_files = ConfigFileCache(max_size=1024 * 16, cache_directory=None, enabled=True)
+        self.__parse_config = load_kwargs.pop("parse_config", None)
+        if self.__parse_config is None:
+            self.__parse_file = functools.partial(config_file_parser, cache=self.__parsed_files)
+        else:
+            self.__parse_file = self.__parse
+        self.__subscribers: List[Callable[[CascadingConfig, CascadingConfigDiff], None]] = []
+        self.__signatures: Dict[str, Tuple] = {}
+        self.__thread: threading.Thread = None
+        self.__stop_event = threading.Event()
+        self.__lock = threading.Lock()
+
+        self.config: CascadingConfig = self.__load()
+
+    def __parse(self, fpath: str) -> dict:
+        key = self.__parsed_files.get_key(fpath)
+        if key is None:
+            # Not cached (e.g. pipes, procfs files)
+            return self.__parse_config(fpath)
+        parsed = self.__parsed_files.get(key)
+        if parsed is None:
+            parsed = self.__parse_config(fpath)
+            self.__parsed_files.set(key, parsed)
+        return parsed
+
+    def __load(self) -> CascadingConfig:
+        # The signatures are taken before loading (new sources are stat-ed while loading), such
+        # that a change while loading is detected by the next check.
+        before = self.__get_signatures(self.watched_paths)
+        config = self.config_type.load(self.src, parse_config=self.__parse_file, **self.load_kwargs)
+        recorded = config.load_graph.signatures
+        self.__signatures = {
+            path: before[path] if path in before else recorded.get(path, None)
+            for path in config.load_graph.files + config.load_graph.directories
+        }
+        return config
+
+    def __wait_for_settle(self, signatures: Dict[str, Tuple]) -> Dict[str, Tuple]:
+        """Wait until the sources stop changing (or the max settle checks), returns the last signatures"""
+        for _ in range(WATCH_MAX_SETTLE_CHECKS):
+            time.sleep(self.settle_interval)
+            current = self.__get_signatures(self.watched_paths)
+            if current == signatures:
+                break
+            signatures = current
+        return signatures
+
+    @staticmethod
+    def __get_signatures(paths: List[str]) -> Dict[str, Tuple]:
+        signatures = {}
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                signatures[path] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            except OSError:
+                signatures[path] = None
+        return signatures
+
+    @property
+    def watched_paths(self) -> List[str]:
+        """The files and directories that are watched"""
+        return list(self.__signatures.keys())
+
+    def subscribe(self, callback: Callable[[CascadingConfig, CascadingConfigDiff], None]) -> Callable[[], None]:
+        """Subscribe to config changes.
+
+        Args:
+            callback ((config, diff)=>None): Called with the new config and the changed paths.
+
+        Returns:
+            ()=>None: Call to unsubscribe.
+        """
+        self.__subscribers.append(callback)
+        return lambda: self.__subscribers.remove(callback)
+
+    def check(self) -> bool:
+        """Check the config sources, and reload the config if changed. Subscribers
+        are notified if the loaded config changed.
+
+        Returns:
+            bool: True if the config changed.
+        """
+        with self.__lock:
+            signatures = self.__get_signatures(self.watched_paths)
+            if signatures == self.__signatures:
+                return False
+
+            old_config = self.config
+            for _ in range(WATCH_MAX_SETTLE_CHECKS):
+                self.__wait_for_settle(signatures)
+                try:
+                    self.config = self.__load()
+                except Exception as ex:
+                    # Keep the current config (e.g. an invalid file), retry on the next change.
+                    log.error(f"Failed to reload config from {self.src}: {ex}")
+                    self.__signatures = self.__get_signatures(self.watched_paths)
+                    return False
+
+                # Reload if the sources changed while loading.
+                signatures = self.__get_signatures(self.watched_paths)
+                if signatures == self.__signatures:
+                    break
+
+            diff = CascadingConfigDiff.compare(old_config, self.config)
+            if not diff:
+                return False
+
+        for callback in list(self.__subscribers):
+            callback(self.config, diff)
+        return True
+
+    def __create_inotify(self) -> _INotify:
+        if not self.use_inotify:
+            return None
+        try:
+            return _INotify(sorted(set(os.path.dirname(p) for p in self.watched_paths) | set(self.watched_paths)))
+        except OSError:
+            return None
+
+    def __run(self):
+        inotify = self.__create_inotify()
+        try:
+            while not self.__stop_event.is_set():
+                if inotify is not None:
+                    inotify.wait(self.poll_interval)
+                else:
+                    self.__stop_event.wait(self.poll_interval)
+
+                if self.__stop_event.is_set():
+                    break
+
+                watched_paths = self.watched_paths
+                try:
+                    self.check()
+                except Exception as ex:
+                    log.error(f"Error while checking config changes: {ex}")
+
+                if inotify is not None and watched_paths != self.watched_paths:
+                    # The config sources changed.
+                    inotify.close()
+                    inotify = self.__create_inotify()
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+    def start(self):
+        """Start watching in a background thread"""
+        if self.__thread is not None:
+            return
+        self.__stop_event.clear()
+        self.__thread = threading.Thread(target=self.__run, daemon=True, name="bole-config-watcher")
+        self.__thread.start()
+
+    def stop(self):
+        """Stop watching"""
+        if self.__thread is None:
+            return
+        self.__stop_event.set()
+        self.__thread.join()
+        self.__thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
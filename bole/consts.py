@@ -8,6 +8,24 @@ may exist. Can be an absolute or relative path. If multiple configuration file
 names exist, the first file will be taken.
 """
 
+CONFIG_CACHE_ENABLED: bool = os.environ.get("BOLE_CONFIG_CACHE", "true").strip().lower() == "true"
+"""If true, cache parsed config files (in memory, and on disk if a cache directory is defined)"""
+
+CONFIG_CACHE_MAX_SIZE: int = int(os.environ.get("BOLE_CONFIG_CACHE_MAX_SIZE", "256"))
+"""The max number of parsed config files to keep in the in-memory cache (LRU)"""
+
+CONFIG_CACHE_DIRECTORY: str = os.environ.get("BOLE_CONFIG_CACHE_DIR", None)
+"""If defined, parsed config files are also cached on disk in this directory"""
+
+CONFIG_INTERN_ENABLED: bool = os.environ.get("BOLE_CONFIG_INTERN", "false").strip().lower() == "true"
+"""If true, intern the keys and strings of parsed config files, and share identical sub trees of loaded configs"""
+
+YAML_BACKEND: str = os.environ.get("BOLE_YAML_BACKEND", "auto").strip().lower()
+"""The yaml backend to use (auto, libyaml, python). Auto will use libyaml if available"""
+
+JSON_BACKEND: str = os.environ.get("BOLE_JSON_BACKEND", "auto").strip().lower()
+"""The json backend to use (auto, orjson, ujson, python). Auto will use the first available in that order"""
+
 
 def is_show_full_errors():
     """If true, show full python errors"""
@@ -2,3 +2,9 @@ class BoleException(Exception):
     """Core bole exception"""
 
     pass
+
+
+class BoleCircularImportException(BoleException):
+    """A config file imports itself (directly or through other imports)"""
+
+    pass
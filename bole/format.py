@@ -1,8 +1,7 @@
 import enum
-import json
-import yaml
 import shlex
 from typing import Union
+from bole.backends import get_json_backend, get_yaml_backend
 
 
 class PrintFormat(enum.Enum):
@@ -38,7 +37,7 @@ def get_print_formatted(
 
     def print_list_value(v):
         if isinstance(v, list) or isinstance(v, dict):
-            v = json.dumps(v)
+            v = get_json_backend().dumps(v, default=str)
         else:
             v = str(v)
         return v
@@ -51,6 +50,6 @@ def get_print_formatted(
             val = [shlex.quote(v) for v in val]
         return " ".join(val)
     elif format == PrintFormat.yaml:
-        return yaml.safe_dump(val)
+        return get_yaml_backend().dump(val)
     else:
-        return json.dumps(val)
+        return get_json_backend().dumps(val, default=str)
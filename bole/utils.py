@@ -1,18 +1,67 @@
-import json
+import copy
+import functools
 import logging
 import os
 import re
 import string
 import random
-from datetime import datetime
-from typing import Any, Callable, List, Type, Union
+from collections.abc import Mapping, Sequence
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, List, Tuple, Type, Union
 
 DEFAULT_RANDOM_STRING_CHARS = string.ascii_letters + string.digits
 
+IMMUTABLE_LEAF_TYPES = frozenset([str, int, float, bool, type(None), bytes, date, datetime, time, timedelta])
+"""Leaf value types that are never copied when cleaning data types"""
 
-def clean_data_types(val):
-    """Converts a data object to json data structure (list,dict,value)"""
-    return json.loads(json.dumps(val))
+
+def clean_data_types(
+    val,
+    deep: bool = True,
+    share_leaves: bool = True,
+):
+    """Converts a data object to a plain data structure (list, dict, value). Custom
+    dictionary and list types (e.g. CascadingConfigDictionary) are converted to dict and list,
+    tuples and other sequences (e.g. read only views) to list. Keys and leaf values (datetime,
+    int keys etc.) are kept as is.
+
+    Args:
+        val (Any): The value to convert.
+        deep (bool, optional): If false, only convert the root collection. Defaults to True.
+        share_leaves (bool, optional): If true, leaf values are shared with the source value. Otherwise,
+            leaf values that are not of IMMUTABLE_LEAF_TYPES are deep copied. Defaults to True.
+
+    Returns:
+        Union[dict, list, Any]: The converted value.
+    """
+
+    def convert_leaf(v):
+        if share_leaves or type(v) in IMMUTABLE_LEAF_TYPES:
+            return v
+        return copy.deepcopy(v)
+
+    leaf_types = IMMUTABLE_LEAF_TYPES
+
+    def convert(v):
+        # Leaf values are checked inline to avoid a call per leaf.
+        if isinstance(v, dict):
+            return {k: item if type(item) in leaf_types else convert(item) for k, item in v.items()}
+        if isinstance(v, (list, tuple)):
+            return [item if type(item) in leaf_types else convert(item) for item in v]
+        if isinstance(v, Mapping):
+            return {k: item if type(item) in leaf_types else convert(item) for k, item in v.items()}
+        if isinstance(v, Sequence) and not isinstance(v, (str, bytes)):
+            return [item if type(item) in leaf_types else convert(item) for item in v]
+        return convert_leaf(v)
+
+    if deep:
+        return val if type(val) in leaf_types else convert(val)
+
+    if isinstance(val, (dict, Mapping)):
+        return {k: convert_leaf(item) for k, item in val.items()}
+    if isinstance(val, (list, tuple)) or (isinstance(val, Sequence) and not isinstance(val, (str, bytes))):
+        return [convert_leaf(item) for item in val]
+    return convert_leaf(val)
 
 
 def resolve_log_level(level_name: Union[str, int]):
@@ -72,6 +121,12 @@ def get_same_type(a, b, *types: Type):
     return None
 
 
+class _MergeChain(list):
+    """Internal. The values of the same key (or list index) across merged collections, in merge order."""
+
+    pass
+
+
 def deep_merge(
     target: Union[dict, list],
     *sources: Union[dict, list],
@@ -80,45 +135,108 @@ def deep_merge(
 ):
     """Merge dictionaries and lists into a single object.
 
+    All sources are merged in a single pass: the values of each key are collected
+    across the sources and merged once. Values are copied only when written to, e.g.
+    a dict that exists in a single source is shared with the result (unless it contains
+    lists). Lists in the result (at any depth) are always new lists, and the sources
+    are never changed.
+
     Args:
-        target (Union[dict, list]): The target to merge into.
+        target (Union[dict, list]): The target to merge into (changed in place).
+        append_lists (bool, optional): If true, merged lists are concatenated. Defaults to True.
+        insert_lists (bool, optional): If true (and not append_lists), merged lists are
+            concatenated in reverse order. Otherwise list items are merged by index. Defaults to False.
+
+    Returns:
+        Union[dict, list]: The merged target.
     """
+
+    def merge_chain(values: list):
+        # The result depends only on the last run of same type collections.
+        last = values[-1]
+        if isinstance(last, dict):
+            merge_type = dict
+        elif isinstance(last, list):
+            merge_type = list
+        else:
+            return last
+
+        start = len(values) - 1
+        while start > 0 and isinstance(values[start - 1], merge_type):
+            start -= 1
+
+        if merge_type is list:
+            return merge_lists([], values[start:])
+        if start == len(values) - 1:
+            return copy_lists(last)
+        return merge_dicts({}, values[start:])
+
+    def copy_lists(value):
+        # A dict is shared unless it contains lists, which are copied (such that lists are never aliased).
+        if isinstance(value, list):
+            return [copy_lists(item) if isinstance(item, (dict, list)) else item for item in value]
+        copied = None
+        for key, item in value.items():
+            if isinstance(item, (dict, list)):
+                item_copy = copy_lists(item)
+                if item_copy is not item:
+                    if copied is None:
+                        copied = dict(value)
+                    copied[key] = item_copy
+        return value if copied is None else copied
+
+    def merge_value(value):
+        if isinstance(value, _MergeChain):
+            return merge_chain(value)
+        if isinstance(value, (dict, list)):
+            return copy_lists(value)
+        return value
+
+    def merge_dicts(merged: dict, dicts: List[dict]):
+        grouped = {}
+        for d in dicts:
+            for key, value in d.items():
+                if key not in grouped:
+                    grouped[key] = value
+                    continue
+                chain = grouped[key]
+                if not isinstance(chain, _MergeChain):
+                    chain = grouped[key] = _MergeChain([chain])
+                chain.append(value)
+
+        for key, value in grouped.items():
+            merged[key] = merge_value(value)
+        return merged
+
+    def merge_lists(merged: list, lists: List[list]):
+        if append_lists:
+            for lst in lists:
+                merged.extend(copy_lists(lst))
+        elif insert_lists:
+            for lst in reversed(lists):
+                merged.extend(copy_lists(lst))
+        else:
+            # Merging list items by index.
+            size = max(len(lst) for lst in lists)
+            for i in range(size):
+                merged.append(merge_chain([lst[i] for lst in lists if i < len(lst)]))
+        return merged
+
     if isinstance(target, list):
         assert all(isinstance(src, list) for src in sources), (
             "Merge target and source must be of the same type (list)",
         )
-        # List merges as concat, and dose not merge the internal values.
+
         if append_lists:
             for src in sources:
-                target += src
+                target.extend(src)
         elif insert_lists:
-            sources: list = list(sources)
-            sources.reverse()
-            for src in sources:
-                target += src
+            for src in reversed(sources):
+                target.extend(src)
         else:
-            # Attempting to merge list items.
-            for src in sources:
-                src_len = len(src)
-                target_len = len(target)
-                max_len = target_len if target_len > src_len else src_len
-
-                for i in range(max_len):
-                    if i >= target_len:
-                        target[i] = src[i]
-                    if i >= src_len:
-                        continue
-                    merge_type: Type = get_same_type(src[i], target[i], list, dict)
-                    if merge_type is None:
-                        target[i] = src[i]
-                    else:
-                        target[i] = deep_merge(
-                            merge_type(),
-                            target[i],
-                            src[i],
-                            append_lists=append_lists,
-                            insert_lists=insert_lists,
-                        )
+            merged = merge_lists([], [target, *sources])
+            target.clear()
+            target.extend(merged)
 
         return target
 
@@ -127,38 +245,134 @@ def deep_merge(
             "Merge target and source must be of the same type (dict)",
         )
 
+        # Collecting the values of each key across the target and sources, then merging once.
+        grouped: Dict[Any, _MergeChain] = {}
         for src in sources:
-            for key in src.keys():
-                if key not in target:
-                    target[key] = src[key]
-                    continue
-                merge_type = get_same_type(src[key], target[key], list, dict)
-                if merge_type is not None:
-                    target[key] = deep_merge(
-                        merge_type(),
-                        target[key],
-                        src[key],
-                        append_lists=append_lists,
-                        insert_lists=insert_lists,
-                    )
-                else:
-                    target[key] = src[key]
+            for key, value in src.items():
+                chain = grouped.get(key, None)
+                if chain is None:
+                    chain = grouped[key] = _MergeChain([target[key]] if key in target else [])
+                chain.append(value)
+
+        for key, chain in grouped.items():
+            target[key] = merge_chain(chain)
+
     return target
 
 
-COLLECTION_ITEM_PART_REGEX = r"^(.*?)(\[([0-9]*)\]|)$"
+COLLECTION_ITEM_PART_REGEX = r"^(.*?)((?:\[[0-9]+\])*)$"
+"""Matches a collection path part, e.g. a[0][1] -> (a, [0][1])"""
+
+COLLECTION_PATH_CACHE_SIZE = 1024
+"""The max number of compiled collection paths to keep (LRU)"""
+
+
+class CollectionPath:
+    __slots__ = ("parts", "__str")
+
+    def __init__(self, parts: Tuple[Union[str, int], ...]) -> None:
+        """A compiled path within a data collection (list, dict). Use compile_collection_path
+        to create a (cached) compiled path from a string.
+
+        Args:
+            parts (Tuple[Union[str, int], ...]): The path parts, str for dict keys, int for list indexes.
+        """
+        self.parts = tuple(parts)
+        self.__str = None
+
+    @classmethod
+    def parse(cls, path: Union[str, List[str]]) -> "CollectionPath":
+        """Parse a path, parts seperated by '.', eg, [22].a.b[33].
+        Empty parts are ignored '..'. If a list then . is ignored.
+
+        Args:
+            path (Union[str, List[str]]): The path to parse.
+
+        Returns:
+            CollectionPath: The compiled path.
+        """
+        if isinstance(path, str):
+            path = path.split(".")
+
+        parts: List[Union[str, int]] = []
+        for cur_item in path:
+            item_parts = re.match(COLLECTION_ITEM_PART_REGEX, cur_item)
+            assert item_parts is not None, f"item parts must match the regex '{COLLECTION_ITEM_PART_REGEX}'"
+            if len(item_parts[1]) > 0:
+                parts.append(item_parts[1])
+            if len(item_parts[2]) > 0:
+                parts += [int(idx) for idx in item_parts[2][1:-1].split("][")]
+
+        return cls(parts)
+
+    def find(
+        self,
+        parent: Union[dict, list, Mapping, Sequence],
+        action: Callable[[Any, Any], Any] = None,
+    ):
+        """Returns the value at this path within a data collection (list, dict, Mapping or Sequence)
+
+        Args:
+            parent (Union[dict, list, Mapping, Sequence]): The value to search
+            action((value, parent)=>any, optional): The action to take when found
+
+        Returns:
+            (any: The value found, bool: true if the value was found)
+        """
+        if len(self.parts) == 0:
+            return None, False
+
+        item = parent
+        for part in self.parts:
+            parent = item
+            if type(part) is int:
+                assert isinstance(parent, list) or (
+                    isinstance(parent, Sequence) and not isinstance(parent, (str, bytes))
+                ), f"[{part}] references a list value but parent is not a list"
+                if len(parent) <= part:
+                    return None, False
+            else:
+                assert isinstance(parent, (dict, Mapping)), f"{part} references a dict value but parent is not a dict"
+                if part not in parent:
+                    return None, False
+            item = parent[part]
+
+        if action is not None:
+            item = action(item, parent)
+
+        return item, True
+
+    def __str__(self) -> str:
+        if self.__str is None:
+            self.__str = "".join(f"[{p}]" if type(p) is int else f".{p}" for p in self.parts).lstrip(".")
+        return self.__str
+
+    def __repr__(self) -> str:
+        return f"CollectionPath({str(self)})"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CollectionPath) and other.parts == self.parts
+
+    def __hash__(self) -> int:
+        return hash(self.parts)
+
+
+@functools.lru_cache(maxsize=COLLECTION_PATH_CACHE_SIZE)
+def compile_collection_path(path: str) -> CollectionPath:
+    """Returns a compiled collection path (cached), e.g. a.b[0].c, see CollectionPath.parse"""
+    return CollectionPath.parse(path)
 
 
 def find_in_collection(
     parent: Union[dict, list],
-    path: Union[str, List[str]],
+    path: Union[str, List[str], CollectionPath],
     action: Callable[[Any, Any], Any] = None,
 ):
     """Returns a path within a data collection (list, dict)
 
     Args:
         val (Union[dict, list]): The value to search
-        path (Union[str, List[str]]): The path, parts seperated by '.', eg,
+        path (Union[str, List[str], CollectionPath]): The path, parts seperated by '.', eg,
             [22].a.b[33].
             empty parts are ignored '..'
             If a list then . is ignored.
@@ -168,52 +382,8 @@ def find_in_collection(
         (any: The value found, bool: true if the value was found)
 
     """
-    # Path defined as a.b[2].c
     if isinstance(path, str):
-        path = path.split(".")
-
-    was_found = False
-    item = None
-
-    if len(path) == 0:
-        return item, was_found
-
-    cur_item = path[0]
-    item_parts = re.match(COLLECTION_ITEM_PART_REGEX, cur_item)
-    assert item_parts is not None, f"item parts must match the regex '{COLLECTION_ITEM_PART_REGEX}'"
-
-    item_name = item_parts[1] if len(item_parts[1]) > 0 else None
-    list_number = int(item_parts[2][1]) if len(item_parts[2]) > 0 else None
-
-    if item_name is None and list_number is None:
-        return find_in_collection(parent, path[1:])
-
-    assert item_name is not None or list_number is not None, "Invalid item path part " + cur_item
-
-    if item_name is not None:
-        assert isinstance(parent, dict), f"{cur_item} references a dict value but parent is not a dict"
-        if item_name not in parent:
-            return None, False
-        item = parent.get(item_name)
-        was_found = True
-
-        # References a list number
-        if list_number is not None:
-            path = [f"[{list_number}]", *path[1:]]
-            return find_in_collection(item, path)
-
-    if list_number is not None:
-        assert isinstance(parent, list), f"{cur_item} references a list value but parent is not a list"
-        if len(parent) <= list_number:
-            return None, False
-        item = parent[list_number]
-        was_found = True
-
-    path = path[1:]
-    if len(path) > 0:
-        return find_in_collection(item, path)
-
-    if was_found and action is not None:
-        item = action(item, parent)
-
-    return item, was_found
+        path = compile_collection_path(path)
+    elif not isinstance(path, CollectionPath):
+        path = CollectionPath.parse(list(path))
+    return path.find(parent, action=action)
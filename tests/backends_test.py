@@ -0,0 +1,35 @@
+import yaml
+from bole.backends import YAML_BACKENDS, get_yaml_backend, set_yaml_backend
+
+
+def test_yaml_backend_auto_select():
+    try:
+        backend = set_yaml_backend("auto")
+        assert backend.name == ("libyaml" if yaml.__with_libyaml__ else "python")
+        assert get_yaml_backend() is backend
+    finally:
+        set_yaml_backend()
+
+
+def test_yaml_backends_same_result():
+    val = {"a": [1, 2, {"b": "c"}], "d": None, "e": 1.5}
+    text = yaml.safe_dump(val)
+    for backend in YAML_BACKENDS.values():
+        assert backend.load(text) == val
+        assert backend.dump(val) == text
+
+
+def test_json_backends_same_result():
+    import json
+    from bole.backends import JSON_BACKENDS
+    from bole.config.dict import CascadingConfigDictionary
+
+    val = CascadingConfigDictionary(a=[1, 2, CascadingConfigDictionary(b="c")], d=None, e=1.5)
+    val[1] = "int key"
+    expected = json.loads(json.dumps(val))
+    for backend in JSON_BACKENDS.values():
+        assert backend.loads(json.dumps(expected)) == expected
+        assert backend.loads('{"nan": NaN}')["nan"] != 0
+        assert backend.load_buffer(bytearray(json.dumps(expected).encode("utf-8"))) == expected
+        assert backend.load_buffer(b'{"nan": NaN}')["nan"] != 0
+        assert backend.dumps(val) == json.dumps(val)
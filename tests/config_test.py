@@ -1,4 +1,8 @@
+import os
+import pickle
+import pytest
 from bole.config.cascading import CascadingConfig
+from bole.exceptions import BoleCircularImportException
 from tests.consts import TEST_CONFIG_PATH
 
 
@@ -124,3 +128,548 @@ def test_config_env():
             "list": [1, 2, 3, 4],
         },
     )
+
+
+def test_config_file_parser_cache(tmp_path, monkeypatch):
+    import bole.config.cascading as cascading
+    from bole.config.cache import ConfigFileCache
+    from bole.config.cascading import config_file_parser
+
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("a: 1")
+    cache = ConfigFileCache(cache_directory=str(tmp_path / "cache"))
+    assert config_file_parser(str(config_path), cache=cache) == {"a": 1}
+    assert len(cache) == 1 and len(os.listdir(tmp_path / "cache")) == 1
+    assert os.stat(tmp_path / "cache").st_mode & 0o777 == 0o700
+
+    def fail_parse(*args, **kwargs):
+        raise Exception("Should not parse a cached config file")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(cascading, "parse_config_file", fail_parse)
+        cached = config_file_parser(str(config_path), cache=cache)
+        assert cached == {"a": 1}
+        cached["a"] = 2
+        assert config_file_parser(str(config_path), cache=cache) == {"a": 1}, "Cache values must be copied"
+
+        # Disk cache
+        cache.clear()
+        assert len(cache) == 0
+        assert config_file_parser(str(config_path), cache=cache) == {"a": 1}
+        assert len(cache) == 1, "Loaded from the disk store"
+
+    # A disk store that others can write to is not trusted.
+    os.chmod(tmp_path / "cache", 0o777)
+    cache.clear()
+    assert not cache.is_disk_trusted()
+    assert cache.get(cache.get_key(str(config_path), "yaml")) is None
+
+    config_path.write_text("a: 22")
+    assert config_file_parser(str(config_path), cache=cache) == {"a": 22}
+    assert len(os.listdir(tmp_path / "cache")) == 1, "Not written to an untrusted disk store"
+
+    disabled = ConfigFileCache(enabled=False)
+    assert config_file_parser(str(config_path), cache=disabled) == {"a": 22}
+    assert len(disabled) == 0
+
+
+def test_config_file_parser_stream(tmp_path):
+    from bole.config.cache import ConfigFileCache
+    from bole.config.cascading import config_file_parser
+
+    cache = ConfigFileCache(enabled=False)
+    for name, text in [("empty.yaml", ""), ("blank.yaml", "  \n\n"), ("comments.yaml", "# a\n"), ("blank.json", " \n")]:
+        (tmp_path / name).write_text(text)
+        assert config_file_parser(str(tmp_path / name), cache=cache) == {}, f"{name} must be parsed as empty"
+
+    (tmp_path / "config.json").write_text('{"a": [1, 2], "b": "\u05d0"}')
+    (tmp_path / "config.yaml").write_text("a: [1, 2]\nb: \u05d0\n", encoding="utf-8")
+    assert config_file_parser(str(tmp_path / "config.json"), cache=cache) == {"a": [1, 2], "b": "\u05d0"}
+    assert config_file_parser(str(tmp_path / "config.yaml"), cache=cache) == {"a": [1, 2], "b": "\u05d0"}
+
+    (tmp_path / "list.json").write_text("[1]")
+    with pytest.raises(AssertionError):
+        config_file_parser(str(tmp_path / "list.json"), cache=cache)
+
+    if os.path.exists("/proc/self/status"):
+        # Procfs files report a zero size but are not empty.
+        assert ConfigFileCache().get_key("/proc/self/status") is None, "Non regular files should not be cached"
+        assert config_file_parser("/proc/self/status", cache=ConfigFileCache())["Pid"] == os.getpid()
+
+
+def test_config_find_compiled_path():
+    config = CascadingConfig.load(TEST_CONFIG_PATH)
+    path = CascadingConfig.compile_path("col.a[0].b")
+    assert config.find(path) == ["source"]
+
+
+def test_config_index():
+    config = CascadingConfig.load(TEST_CONFIG_PATH)
+    config.use_index = True
+    assert config.find("col.a[0].b", "list[1]", "missing") == ["source", 2]
+    assert config.find("col.a[0].b", action=lambda val, parent: parent)[0] is config["col"]["a"][0]
+    assert config.find_prefix("col") == {
+        "col.a": [{"b": "source"}],
+        "col.a[0]": {"b": "source"},
+        "col.a[0].b": "source",
+    }
+
+    index = config.index
+    assert config.index is index, "Index should be built once"
+    config["new_value"] = {"a": 1}
+    assert config.index is not index, "Index should be invalidated on change"
+    assert config.find("new_value.a") == [1]
+
+    # Nested changes are not tracked.
+    config["new_value"]["a"] = 2
+    assert config.find("new_value.a") == [1]
+    config.invalidate_index()
+    assert config.find("new_value.a") == [2]
+
+    # Indexed configs can be copied (pickled), without the index.
+    copied = pickle.loads(pickle.dumps(config))
+    assert copied.use_index and copied == config and copied.source_path == config.source_path
+    index = copied.index
+    copied.pop("new_value")
+    assert copied.index is not index and copied.find("new_value.a") == []
+
+
+def test_config_parsed_properties_cache():
+    config = CascadingConfig.parse({"settings": {"inherit": True}, "import": ["a.yaml"], "environments": {"dev": {}}})
+    assert config.settings is config.settings
+    assert config.config_imports is config.config_imports
+    assert config.environments is config.environments
+
+    config["settings"]["inherit"] = False
+    assert config.settings.inherit is False, "Changes to the settings dict must be reflected"
+    config["settings"] = {"inherit_siblings": False}
+    assert config.settings.inherit is None and config.settings.inherit_siblings is False
+
+    config["import"].append({"path": "b.yaml"})
+    assert [i.path for i in config.config_imports] == ["a.yaml", "b.yaml"]
+    config["import"][1]["path"] = "c.yaml"
+    assert [i.path for i in config.config_imports] == ["a.yaml", "c.yaml"]
+
+    del config["environments"]
+    assert config.environments == {}
+
+
+def test_config_load_parallel():
+    from concurrent.futures import ThreadPoolExecutor
+
+    expected = CascadingConfig.load(TEST_CONFIG_PATH, environment="test").to_dictionary()
+    with ThreadPoolExecutor(4) as executor:
+        assert CascadingConfig.load(TEST_CONFIG_PATH, environment="test", executor=executor).to_dictionary() == expected
+    assert CascadingConfig.load(TEST_CONFIG_PATH, environment="test", executor="process").to_dictionary() == expected
+
+
+def test_config_load_process_cache(tmp_path):
+    from concurrent.futures import ProcessPoolExecutor
+    from bole.config.cache import CONFIG_FILE_CACHE
+
+    class CountingExecutor(ProcessPoolExecutor):
+        submitted = []
+
+        def submit(self, fn, *args, **kwargs):
+            self.submitted.append(args[0])
+            return super().submit(fn, *args, **kwargs)
+
+    (tmp_path / "config.yaml").write_text("import: ['parts/*.yaml']\n")
+    (tmp_path / "parts").mkdir()
+    for name in ["a", "b"]:
+        (tmp_path / "parts" / f"{name}.yaml").write_text(f"{name}: 1\n")
+
+    CONFIG_FILE_CACHE.clear()
+    with CountingExecutor(2) as executor:
+        assert CascadingConfig.load(str(tmp_path), executor=executor).to_dictionary() == {"a": 1, "b": 1}
+        assert len(executor.submitted) == 3 and len(CONFIG_FILE_CACHE) == 3, "Process results should be cached"
+        executor.submitted.clear()
+        assert CascadingConfig.load(str(tmp_path), executor=executor).to_dictionary() == {"a": 1, "b": 1}
+        assert len(executor.submitted) == 0, "Cached files should not be parsed in the executor"
+
+
+def test_config_aload(parse_recorder):
+    import asyncio
+
+    async def load():
+        return (
+            await CascadingConfig.aload(TEST_CONFIG_PATH, environment="test"),
+            await CascadingConfig.aload(TEST_CONFIG_PATH, environment="test", parse_config=parse_recorder.parse_async),
+        )
+
+    config, async_parsed_config = asyncio.run(load())
+    expected = CascadingConfig.load(TEST_CONFIG_PATH, environment="test").to_dictionary()
+    assert config.to_dictionary() == expected
+    assert async_parsed_config.to_dictionary() == expected
+    assert len(parse_recorder.parsed) > 0
+
+
+def test_config_load_layered():
+    for environment in [None, "test"]:
+        expected = CascadingConfig.load(TEST_CONFIG_PATH, environment=environment)
+        config = CascadingConfig.load_layered(TEST_CONFIG_PATH, environment=environment)
+        assert config.find("col.a[0].b", "list", "missing") == expected.find("col.a[0].b", "list", "missing")
+        assert list(config.keys()) == list(expected.keys())
+        assert config.to_dictionary() == expected.to_dictionary()
+        assert config.source_path == expected.source_path
+
+
+def test_config_load_graph(tmp_path, monkeypatch):
+    from bole.config.graph import CascadingConfigLoadGraph
+
+    config = CascadingConfig.load(TEST_CONFIG_PATH)
+    graph = config.load_graph
+    assert [e.kind for e in graph.get_edges(os.path.join(TEST_CONFIG_PATH, "config.yaml"))] == ["search"]
+    assert [e.kind for e in graph.get_edges(os.path.join(TEST_CONFIG_PATH, "imported.yaml"))] == ["import"]
+    glob_edges = graph.get_edges(os.path.join(TEST_CONFIG_PATH, "sub_configs", "test1.import.yaml"))
+    assert [(e.kind, e.pattern) for e in glob_edges] == [("glob", "**/*.import.yaml")]
+    assert CascadingConfigLoadGraph.from_dict(graph.to_dict()).to_dict() == graph.to_dict()
+
+    # Reused searches (no file system searches)
+    def no_search(path):
+        raise OSError("No file searches expected")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(os, "scandir", no_search)
+        reloaded = CascadingConfig.load(TEST_CONFIG_PATH, graph=graph)
+    assert reloaded.to_dictionary() == config.to_dictionary()
+    assert reloaded.load_graph.files == graph.files
+
+    # Invalidated by a new file
+    (tmp_path / "config.yaml").write_text("a: 1\n")
+    config = CascadingConfig.load(str(tmp_path))
+    assert config.load_graph.is_valid()
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "x.yaml").write_text("b: 2\n")
+    (tmp_path / "config.yaml").write_text("import: ['**/x.yaml']\na: 1\n")
+    assert not config.load_graph.is_valid()
+    assert CascadingConfig.load(str(tmp_path), graph=config.load_graph).to_dictionary() == {"a": 1, "b": 2}
+
+
+def test_config_file_system(monkeypatch):
+    import glob
+    from bole.config.file_system import CascadingConfigFileSystem
+    from bole.config.graph import CascadingConfigLoadGraph
+
+    file_system = CascadingConfigFileSystem()
+    for pattern in ["**/*.yaml", "**", "*/sub_configs/test?.import.yaml", "**/", "missing/*", "config.yaml"]:
+        for recursive in [False, True]:
+            pattern = os.path.join(TEST_CONFIG_PATH, pattern)
+            assert file_system.glob(pattern, recursive=recursive) == glob.glob(pattern, recursive=recursive)
+
+    listed = []
+    scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda p: listed.append(p) or scandir(p))
+    file_system = CascadingConfigFileSystem()
+    expected = CascadingConfig.load(TEST_CONFIG_PATH, environment="test").to_dictionary()
+    listed.clear()
+    config = CascadingConfig.load(TEST_CONFIG_PATH, environment="test", file_system=file_system)
+    assert config.to_dictionary() == expected
+    assert len(listed) > 0 and len(listed) == len(set(listed)), "A directory was listed more than once"
+
+    listed.clear()
+    config = CascadingConfig.load(TEST_CONFIG_PATH, file_system=file_system)
+    assert len(listed) == 0
+    assert config.load_graph.is_valid() and config.load_graph.file_system is None
+
+    walked = [d for d, _, _ in os.walk(TEST_CONFIG_PATH)]
+    assert list(file_system.walk(TEST_CONFIG_PATH)) == walked
+    assert file_system.stat(os.path.join(TEST_CONFIG_PATH, "missing.yaml")) is None
+    monkeypatch.setattr(os, "stat", lambda *args, **kwargs: None)
+    graph = CascadingConfigLoadGraph(file_system=file_system)
+    graph.add_search_path(os.path.join(TEST_CONFIG_PATH, "**", "*.yaml"))
+    assert graph.directories == walked, "Signatures should be recorded from the cached listings"
+
+
+def test_config_load_environments(parse_recorder):
+    configs = CascadingConfig.load_environments(
+        TEST_CONFIG_PATH, [None, "test", "missing"], parse_config=parse_recorder
+    )
+    assert list(configs.keys()) == [None, "test", "missing"]
+    parsed = parse_recorder.parsed
+    assert len(parsed) == len(set(parsed)), "A config file was parsed more than once"
+    for environment, config in configs.items():
+        assert config.to_dictionary() == CascadingConfig.load(TEST_CONFIG_PATH, environment=environment).to_dictionary()
+    assert configs["test"].find("list") != configs[None].find("list")
+
+
+def test_config_snapshot(tmp_path, monkeypatch):
+    import datetime
+    from bole.config.snapshot import CascadingConfigSnapshot
+
+    snapshot_path = str(tmp_path / "config.snapshot")
+    CascadingConfig.compile_snapshot(snapshot_path, TEST_CONFIG_PATH, environments=[None, "test"])
+
+    def no_parse(fpath):
+        raise AssertionError("Config files should not be parsed when loading a valid snapshot")
+
+    for environment in [None, "test"]:
+        expected = CascadingConfig.load(TEST_CONFIG_PATH, environment=environment)
+        config = CascadingConfig.load_snapshot(snapshot_path, environment=environment, parse_config=no_parse)
+        assert config.to_dictionary() == expected.to_dictionary()
+        assert config.source_path == expected.source_path
+        assert config.load_graph.files == expected.load_graph.files
+
+    # Sources changed
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "config.yaml").write_text("a: 1\n")
+    CascadingConfig.compile_snapshot(snapshot_path, str(src))
+    assert CascadingConfigSnapshot.read(snapshot_path).is_valid()
+    (src / "config.yaml").write_text("a: 2\n")
+    assert CascadingConfig.load_snapshot(snapshot_path).to_dictionary() == {"a": 2}
+    (src / "config.yaml").write_text("a: 1\n")
+    (src / "config.json").write_text("{}")
+    assert not CascadingConfigSnapshot.read(snapshot_path).is_valid()
+    with pytest.raises(AssertionError):
+        CascadingConfig.load_snapshot(snapshot_path, fallback=False)
+
+    # Yaml timestamps
+    (src / "config.json").unlink()
+    (src / "config.yaml").write_text("a: 2020-01-02\nb: [{c: 2020-01-02 03:04:05+01:00}]\n")
+    CascadingConfig.compile_snapshot(snapshot_path, str(src))
+    expected = CascadingConfig.load(str(src)).to_dictionary()
+    assert CascadingConfig.load_snapshot(snapshot_path, fallback=False).to_dictionary() == expected
+    assert type(expected["b"][0]["c"]) is datetime.datetime
+
+    # Written by another python version
+    data = bytearray(open(snapshot_path, "rb").read())
+    data[12] += 1
+    with pytest.raises(AssertionError):
+        CascadingConfigSnapshot.from_bytes(bytes(data))
+
+
+def test_config_store(tmp_path):
+    import datetime
+    from bole.config.store import CascadingConfigStore
+
+    config = CascadingConfig.load(TEST_CONFIG_PATH, environment="test")
+    expected = config.to_dictionary()
+    expected.update({1: "int key", "big": 2**70, "date": datetime.date(2020, 1, 1), "float": 1.5, "none": None})
+
+    store_path = str(tmp_path / "config.store")
+    CascadingConfigStore.write(store_path, expected)
+    with CascadingConfigStore(store_path) as store:
+        assert store.to_dictionary() == expected
+        assert list(store.keys()) == list(expected.keys())
+        assert store[1] == "int key" and store["big"] == 2**70 and store["date"] == datetime.date(2020, 1, 1)
+        assert "missing" not in store and 2 not in store
+        assert store.find("col.a[0].b", "list[1]", "list[9]", "missing") == config.find("col.a[0].b", "list[1]")
+        assert store.find("col.a", action=lambda val, parent: parent)[0]["a"] == store["col"]["a"]
+
+
+def test_config_freeze():
+    config = CascadingConfig.load(TEST_CONFIG_PATH, environment="test")
+    config["shared"] = {"a": [{"b": 1}], "c": [{"b": 1}], "d": [{"b": True}], "e": [{"b": 1.0}], "f": [-0.0, 0.0]}
+    frozen = config.freeze(report=True)
+
+    assert frozen.to_dictionary() == config.to_dictionary()
+    assert frozen.find("col.a[0].b", "list[1]", "missing") == config.find("col.a[0].b", "list[1]")
+    assert frozen.source_path == config.source_path
+    assert frozen["shared"]["a"] is frozen["shared"]["c"], "Identical sub trees should be shared"
+    assert frozen["shared"]["a"] is not frozen["shared"]["d"] and frozen["shared"]["a"] is not frozen["shared"]["e"]
+    assert type(frozen["shared"]["d"][0]["b"]) is bool and str(frozen["shared"]["f"]) == "(-0.0, 0.0)"
+    assert hash(frozen) == hash(config.freeze()) and frozen == config.freeze()
+    assert frozen.memory_report.after.size < frozen.memory_report.before.size
+    with pytest.raises(TypeError):
+        frozen["a"] = 1
+
+
+def test_config_intern(monkeypatch):
+    import bole.config.cascading
+    from bole.config.memory import ConfigMemoryUsage, intern_config_value
+
+    expected = CascadingConfig.load(TEST_CONFIG_PATH, environment="test")
+    monkeypatch.setattr(bole.config.cascading, "CONFIG_INTERN_ENABLED", True)
+    config = CascadingConfig.load(TEST_CONFIG_PATH, environment="test")
+    assert config.to_dictionary() == expected.to_dictionary()
+
+    val = {"a": [{"b": "x" * 20}], "c": [{"b": "x" * 20}], "d": [{"b": True}], "e": [{"b": 1}], "f": [-0.0, 0.0]}
+    before = ConfigMemoryUsage.measure(val)
+    interned = intern_config_value(val)
+    assert interned is val and val["a"] is val["c"] and val["a"] is not val["d"] and val["d"] is not val["e"]
+    assert type(val["d"][0]["b"]) is bool and str(val["f"]) == "[-0.0, 0.0]"
+    assert ConfigMemoryUsage.measure(val).size < before.size
+
+
+def test_config_import_diamond(tmp_path, parse_recorder):
+    (tmp_path / "config.yaml").write_text("import: [b.yaml, c.yaml]\nlist: [a]\n")
+    (tmp_path / "b.yaml").write_text("import: [d.yaml]\nb: 1\n")
+    (tmp_path / "c.yaml").write_text("import: [d.yaml]\nc: 1\n")
+    (tmp_path / "d.yaml").write_text("list: [d]\nd: 1\n")
+
+    config = CascadingConfig.load(str(tmp_path), parse_config=parse_recorder)
+    assert sorted(config["list"]) == ["a", "d"], "A diamond import should be merged once"
+    assert config.find("b", "c", "d") == [1, 1, 1]
+    assert len(parse_recorder.parsed) == len(set(parse_recorder.parsed)) == 4
+    assert config.load_graph.counters["skipped_duplicate_imports"] == 1
+
+
+def test_config_import_cycle(tmp_path):
+    (tmp_path / "config.yaml").write_text("import: [a.yaml]\nsrc: 1\n")
+    (tmp_path / "a.yaml").write_text("import: [b.yaml]\na: 1\n")
+    (tmp_path / "b.yaml").write_text("import: [a.yaml]\nb: 1\n")
+    with pytest.raises(BoleCircularImportException) as error:
+        CascadingConfig.load(str(tmp_path))
+    assert "a.yaml -> " in str(error.value) and str(error.value).endswith("a.yaml")
+
+    # A glob that matches the importing file is skipped.
+    (tmp_path / "b.yaml").write_text("import: ['*.yaml']\nb: 1\n")
+    config = CascadingConfig.load(str(tmp_path))
+    assert config.find("src", "a", "b") == [1, 1, 1]
+    assert config.load_graph.counters["skipped_cyclic_glob_imports"] == 3
+
+
+def test_config_import_large_glob(tmp_path):
+    count = 1000
+    (tmp_path / "parts").mkdir()
+    for i in range(count):
+        (tmp_path / "parts" / f"{i:04d}.yaml").write_text(f"v{i}: {i}\nlist: [{i}]\n")
+
+    # Imported twice, the second glob is skipped.
+    (tmp_path / "config.yaml").write_text("import: ['parts/*.yaml', 'parts/*.yaml']\n")
+    config = CascadingConfig.load(str(tmp_path))
+    assert len(config["list"]) == count and sorted(config["list"]) == list(range(count))
+    assert config.load_graph.counters["skipped_duplicate_imports"] == count
+    assert config.find(f"v{count - 1}") == [count - 1]
+
+
+def test_config_import_lazy(tmp_path, parse_recorder):
+    (tmp_path / "config.yaml").write_text(
+        "a: 1\nimport:\n  - path: routes.yaml\n    lazy: true\n  - path: 'flags/*.yaml'\n    lazy: true\n"
+    )
+    (tmp_path / "routes.yaml").write_text(
+        "routes: [r1]\nimport: [extra.yaml]\nenvironments:\n  prod:\n    routes: [r2]\n"
+    )
+    (tmp_path / "extra.yaml").write_text("extra: 1\n")
+    (tmp_path / "flags").mkdir()
+    (tmp_path / "flags" / "a.yaml").write_text("flags: {a: true}\n")
+
+    config = CascadingConfig.load_layered(str(tmp_path), environment="prod", parse_config=parse_recorder)
+    assert parse_recorder.names == ["config.yaml"], "Lazy imports must not be parsed on load"
+    assert config.load_graph.counters["deferred_lazy_imports"] == 2
+    assert config.settings.inherit_siblings and "import" not in config
+
+    assert config["routes"] == ["r1", "r2"]
+    assert config.find("flags.a") == [True]
+    assert sorted(parse_recorder.names) == ["a.yaml", "config.yaml", "routes.yaml"]
+
+    # Merged configs load lazy files as data only as well (the environments are applied).
+    expected = CascadingConfig.load(str(tmp_path), environment="prod", parse_config=parse_recorder)
+    assert expected.to_dictionary() == config.to_dictionary() and "environments" not in expected
+    assert "extra" not in expected and "extra.yaml" not in parse_recorder.names, "Lazy files imports are ignored"
+
+
+def test_config_import_mount(tmp_path, parse_recorder):
+    (tmp_path / "config.yaml").write_text(
+        "services:\n  api: {port: 80, hosts: [a]}\n"
+        "import:\n  - path: api.yaml\n    mount: services.api\n"
+        "  - path: routes.yaml\n    mount: routing\n    lazy: true\n"
+    )
+    (tmp_path / "api.yaml").write_text("hosts: [b]\ntimeout: 5\nimport:\n  - path: tls.yaml\n    mount: tls\n")
+    (tmp_path / "tls.yaml").write_text("enabled: true\nenvironments:\n  prod:\n    enabled: false\n")
+    (tmp_path / "routes.yaml").write_text("default: /index\n")
+
+    prod = CascadingConfig.load(str(tmp_path), environment="prod")
+    assert prod.find("services.api.tls.enabled") == [False] and "environments" not in prod
+    assert "environments" not in prod["services"]["api"]["tls"], "Mounted environments are applied and removed"
+
+    config = CascadingConfig.load(str(tmp_path))
+    assert config["services"]["api"] == {"port": 80, "hosts": ["a", "b"], "timeout": 5, "tls": {"enabled": True}}
+    assert config["routing"] == {"default": "/index"}
+    assert "timeout" not in config and "enabled" not in config
+
+    layered = CascadingConfig.load_layered(str(tmp_path), parse_config=parse_recorder)
+    assert layered.find("services.api.tls.enabled") == [True]
+    assert "routes.yaml" not in parse_recorder.names, "Lazy mounted files are parsed only when accessed under the mount"
+    assert layered.find("routing.default") == ["/index"] and "routes.yaml" in parse_recorder.names
+    assert layered.to_dictionary() == config.to_dictionary()
+
+    (tmp_path / "config.yaml").write_text("import:\n  - path: api.yaml\n    mount: list[0]\n")
+    with pytest.raises(AssertionError):
+        CascadingConfig.load(str(tmp_path))
+
+
+def test_config_import_identical(tmp_path, monkeypatch):
+    (tmp_path / "config.yaml").write_text(
+        "import:\n  - 'teams/*/shared.yaml'\n  - path: teams/a/shared.yaml\n    mount: shared\n  - other.yaml\n"
+    )
+    (tmp_path / "teams").mkdir()
+    for team in ["a", "b", "c"]:
+        (tmp_path / "teams" / team).mkdir()
+    (tmp_path / "teams" / "a" / "shared.yaml").write_text("list: [1]\n")
+    (tmp_path / "teams" / "b" / "shared.yaml").write_text("list: [1]\n")
+    os.link(tmp_path / "teams" / "a" / "shared.yaml", tmp_path / "teams" / "c" / "shared.yaml")
+    (tmp_path / "other.yaml").write_text("list: [2]\n")
+
+    config = CascadingConfig.load(str(tmp_path))
+    assert sorted(config["list"]) == [1, 2]
+    assert config["shared"] == {"list": [1]}, "Identical documents with a different mount are loaded"
+    assert config.load_graph.counters["skipped_identical_imports"] == 2
+    assert len(config.load_graph.files) == 5, "Skipped files are tracked by the load graph"
+
+    # Lazy imports are not read to compare them (same size as other.yaml)
+    from bole.config.snapshot import CascadingConfigSnapshot
+
+    hashed = []
+    get_file_hash = CascadingConfigSnapshot.get_file_hash
+    monkeypatch.setattr(CascadingConfigSnapshot, "get_file_hash", lambda f: hashed.append(f) or get_file_hash(f))
+    (tmp_path / "config.yaml").write_text("import:\n  - other.yaml\n  - path: lazy.yaml\n    lazy: true\n")
+    (tmp_path / "lazy.yaml").write_text("list: [3]\n")
+    layered = CascadingConfig.load_layered(str(tmp_path))
+    assert len(hashed) == 0 and layered.load_graph.counters["deferred_lazy_imports"] == 1
+
+
+def test_config_load_profile(tmp_path):
+    from bole.config.file_system import CascadingConfigFileSystem
+    from bole.config.profile import CascadingConfigLoadProfile
+
+    (tmp_path / "config.yaml").write_text("a: 1\nimport: ['parts/*.json']\n")
+    (tmp_path / "parts").mkdir()
+    (tmp_path / "parts" / "b.json").write_text('{"b": [1, 2]}')
+
+    config = CascadingConfig.load(str(tmp_path), profile=True)
+    profile = config.load_profile
+    assert profile is not None and CascadingConfig.load(str(tmp_path)).load_profile is None
+
+    files = {os.path.basename(f.fpath): f for f in profile.files.values()}
+    assert files["config.yaml"].bytes == (tmp_path / "config.yaml").stat().st_size
+    assert files["b.json"].bytes == (tmp_path / "parts" / "b.json").stat().st_size
+    assert not files["config.yaml"].cached and files["config.yaml"].parse_time > 0
+    assert profile.counters["stat"] > 0 and profile.counters["glob"] == 1 and profile.counters["listdir"] > 0
+    assert profile.times["total"] >= profile.times["merge"] > 0
+
+    as_dict = profile.to_dict()
+    assert as_dict["bytes_read"] == profile.bytes_read and len(as_dict["files"]) == 2
+    assert "config.yaml" in profile.to_table()
+
+    # A profile object, parsed files cache hits.
+    custom = CascadingConfigLoadProfile()
+    layered = CascadingConfig.load_layered(str(tmp_path), profile=custom, executor="thread")
+    assert layered.load_profile is custom and all(f.cached for f in custom.files.values())
+    assert len(custom.files) == 2
+
+    # Parsed twice, the parse time excludes the reads of each parse.
+    custom = CascadingConfigLoadProfile()
+    for _ in range(2):
+        custom.add_read("f.yaml", 1.0, 10)
+        custom.add_parse("f.yaml", 1.5, read_time=1.0)
+    assert custom.files["f.yaml"].parse_time == 1.0 and custom.files["f.yaml"].read_time == 2.0
+
+    # Graph validation stats are counted, cached file system calls are not.
+    reloaded = CascadingConfig.load(str(tmp_path), profile=True, graph=config.load_graph)
+    assert reloaded.load_profile.counters["stat"] >= len(config.load_graph.signatures)
+    file_system = CascadingConfigFileSystem()
+    CascadingConfig.load(str(tmp_path), file_system=file_system)
+    reloaded = CascadingConfig.load(str(tmp_path), profile=True, file_system=file_system)
+    assert "listdir" not in reloaded.load_profile.counters and reloaded.load_profile.counters["realpath"] == 2
+    # The parsed files cache key of each file
+    assert reloaded.load_profile.counters["stat"] == 2
+
+    # Lazy files parsed after the load
+    (tmp_path / "config.yaml").write_text("a: 1\nimport:\n  - path: lazy.yaml\n    lazy: true\n    mount: lazy\n")
+    (tmp_path / "lazy.yaml").write_text("b: 1\n")
+    layered = CascadingConfig.load_layered(str(tmp_path), profile=True)
+    lazy_path = str(tmp_path / "lazy.yaml")
+    assert lazy_path not in layered.load_profile.files
+    assert layered.find("lazy.b") == [1] and lazy_path in layered.load_profile.files
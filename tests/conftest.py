@@ -0,0 +1,29 @@
+import os
+import asyncio
+import pytest
+from typing import List
+from bole.config.cascading import config_file_parser
+
+
+class ParseRecorder:
+    def __init__(self) -> None:
+        """A config file parser (see config_file_parser) that records the parsed file paths"""
+        self.parsed: List[str] = []
+
+    @property
+    def names(self) -> List[str]:
+        """The parsed file names"""
+        return [os.path.basename(fpath) for fpath in self.parsed]
+
+    def __call__(self, fpath: str) -> dict:
+        self.parsed.append(fpath)
+        return config_file_parser(fpath)
+
+    async def parse_async(self, fpath: str) -> dict:
+        await asyncio.sleep(0)
+        return self(fpath)
+
+
+@pytest.fixture
+def parse_recorder() -> ParseRecorder:
+    return ParseRecorder()
@@ -0,0 +1,64 @@
+from datetime import datetime
+from bole.config.dict import CascadingConfigDictionary
+from bole.utils import clean_data_types
+
+
+def test_clean_data_types():
+    now = datetime.now()
+    leaf = {"x": 1}
+    val = CascadingConfigDictionary(a=(1, CascadingConfigDictionary(b=now)), c=[leaf])
+    val[1] = "int key"
+
+    cleaned = clean_data_types(val)
+    assert type(cleaned) is dict and type(cleaned["a"][1]) is dict
+    assert cleaned == {"a": [1, {"b": now}], "c": [{"x": 1}], 1: "int key"}
+    assert cleaned["c"][0] is not leaf, "Collections must be copied"
+
+    shallow = clean_data_types(val, deep=False)
+    assert type(shallow) is dict and shallow["c"] is val["c"]
+    assert clean_data_types(val, deep=False, share_leaves=False)["c"] is not val["c"]
+
+
+def test_find_in_collection():
+    from bole.utils import compile_collection_path, find_in_collection
+
+    val = {"a": [{"b": list(range(20))}, [[0, 1], [2, 3]]]}
+    assert find_in_collection(val, "a[0].b[12]") == (12, True), "Multi digit indexes must be supported"
+    assert find_in_collection(val, "a[1][1][0]") == (2, True)
+    assert find_in_collection(val, "..a[0]..b[3]") == (3, True)
+    assert find_in_collection(val, ["a[0]", "b[3]"]) == (3, True)
+    assert find_in_collection(val, "a[0].c") == (None, False)
+    assert find_in_collection(val, "a[3]") == (None, False)
+    assert find_in_collection(val, "a[0].b[1]", action=lambda v, parent: parent)[0] is val["a"][0]["b"]
+
+    path = compile_collection_path("a[0].b[12]")
+    assert path is compile_collection_path("a[0].b[12]"), "Compiled paths must be cached"
+    assert str(path) == "a[0].b[12]" and path.parts == ("a", 0, "b", 12)
+    assert path.find(val) == (12, True)
+
+
+def test_deep_merge():
+    from bole.utils import deep_merge
+
+    shared = {"x": 1}
+    sources = [{"a": {"b": [1]}, "c": shared}, {"a": {"b": [2], "d": 1}}, {"a": {"b": [3]}, "e": "f"}]
+    merged = deep_merge({"a": {"g": 0}}, *sources)
+    assert merged == {"a": {"g": 0, "b": [1, 2, 3], "d": 1}, "c": {"x": 1}, "e": "f"}
+    assert sources[0] == {"a": {"b": [1]}, "c": shared} and sources[1]["a"]["b"] == [2], "Sources must not change"
+    assert merged["c"] is shared, "Values that are not merged should not be copied"
+
+    lists = [[1], [2]]
+    merged = deep_merge({}, {"l": lists[0]}, {"z": lists[1]})
+    assert merged["l"] is not lists[0] and merged["z"] is not lists[1], "Lists should never be aliased"
+
+    nested = {"n": {"l": [1, {"m": [2]}]}, "k": 1}
+    merged = deep_merge({}, {"c": nested}, {"d": 1})
+    assert merged["c"] == nested and merged["c"]["n"]["l"] is not nested["n"]["l"], "Nested lists should be copied"
+    assert merged["c"]["n"]["l"][1]["m"] is not nested["n"]["l"][1]["m"], "Nested lists should be copied"
+    merged["c"]["n"]["l"].append(3)
+    assert nested["n"]["l"] == [1, {"m": [2]}], "Sources must not change"
+
+    assert deep_merge({}, {"a": [{"b": 1}, 2]}, {"a": [{"c": 1}]}, append_lists=False) == {"a": [{"b": 1, "c": 1}, 2]}
+    assert deep_merge({}, {"a": [1]}, {"a": [1, 2, 3]}, append_lists=False) == {"a": [1, 2, 3]}
+    assert deep_merge({}, {"a": [1]}, {"a": [2]}, append_lists=False, insert_lists=True) == {"a": [2, 1]}
+    assert deep_merge({}, {"a": {"b": 1}}, {"a": 2}, {"a": {"c": 1}}) == {"a": {"c": 1}}
@@ -0,0 +1,90 @@
+import os
+import time
+import threading
+from bole.config.cascading import config_file_parser
+from bole.config.watch import CascadingConfigDiff, CascadingConfigWatcher
+
+
+def test_config_diff():
+    diff = CascadingConfigDiff.compare(
+        {"a": {"b": 1, "c": [1, 2]}, "d": 1, "e": [1]},
+        {"a": {"b": 2, "c": [1, 3]}, "f": 1, "e": [1, 2]},
+    )
+    assert diff.added == ["f"]
+    assert diff.removed == ["d"]
+    assert diff.changed == ["a.b", "a.c[1]", "e"]
+
+
+def test_config_watcher_reload(tmp_path):
+    from bole.config.cache import CONFIG_FILE_CACHE
+
+    (tmp_path / "config.yaml").write_text("a: 1\nimport:\n  - '*.import.yaml'\n")
+    (tmp_path / "x.import.yaml").write_text("b: 1\n")
+
+    changes = []
+    CONFIG_FILE_CACHE.clear()
+    watcher = CascadingConfigWatcher(str(tmp_path))
+    assert len(CONFIG_FILE_CACHE) == 0, "Files should be cached once (in the watcher cache)"
+    watcher.subscribe(lambda config, diff: changes.append((config, diff)))
+    assert watcher.config.find("a", "b") == [1, 1]
+    assert not watcher.check()
+
+    (tmp_path / "x.import.yaml").write_text("b: 22\n")
+    assert watcher.check()
+    assert changes[-1][0].find("b") == [22] and changes[-1][1].changed == ["b"]
+
+    # New glob import file
+    (tmp_path / "y.import.yaml").write_text("c: 1\n")
+    assert watcher.check()
+    assert changes[-1][1].added == ["c"]
+
+
+def test_config_watcher_thread(tmp_path):
+    (tmp_path / "config.yaml").write_text("a: 1\n")
+    changed = threading.Event()
+    values = []
+    with CascadingConfigWatcher(str(tmp_path), poll_interval=0.05) as watcher:
+        watcher.subscribe(lambda config, diff: values.append(config.find("a")) or changed.set())
+        time.sleep(0.1)
+        (tmp_path / "config.yaml").write_text("a: 22\n")
+        assert changed.wait(5), "Config change was not detected"
+    assert values == [[22]], "Subscribers should not be notified with a partially written file"
+
+
+def test_config_watcher_write_while_loading(tmp_path):
+    (tmp_path / "config.yaml").write_text("a: 1\n")
+
+    def parse_config(fpath: str):
+        parsed = config_file_parser(fpath)
+        if parsed.get("a") == 2:
+            # Written after the file was parsed
+            (tmp_path / "config.yaml").write_text("a: 333\n")
+        return parsed
+
+    watcher = CascadingConfigWatcher(str(tmp_path), parse_config=parse_config, settle_interval=0.01)
+    (tmp_path / "config.yaml").write_text("a: 2\n")
+    assert watcher.check()
+    assert watcher.config.find("a") == [333], "A change while loading should be reloaded"
+    assert not watcher.check()
+
+
+def test_config_watcher_uncached_sources(tmp_path):
+    # Zero size files (e.g. procfs files) must be parsed on every load, and never share a cache entry.
+    imports = [{"path": "a.yaml", "mount": "a"}, {"path": "b.yaml", "mount": "b"}]
+    (tmp_path / "config.yaml").write_text("a: 1\n")
+    (tmp_path / "a.yaml").write_text("")
+    (tmp_path / "b.yaml").write_text("")
+    parsed = []
+
+    def parse_config(fpath: str):
+        parsed.append(os.path.basename(fpath))
+        if parsed[-1] == "config.yaml":
+            return {"import": imports}
+        return {parsed[-1]: len(parsed)}
+
+    watcher = CascadingConfigWatcher(str(tmp_path), parse_config=parse_config, settle_interval=0.01)
+    assert watcher.config.to_dictionary() == {"a": {"a.yaml": 2}, "b": {"b.yaml": 3}}
+
+    (tmp_path / "config.yaml").write_text("a: 2\n")
+    assert watcher.check()
+    assert watcher.config.to_dictionary() == {"a": {"a.yaml": 5}, "b": {"b.yaml": 6}}